@@ -1,25 +1,57 @@
-from .debug import IS_DEBUG, log
-from .messages import loser_message
-from .messages import winner_message
-from .messages import kolab_message_bordered
-from .display_helper import rgba_to_hex, WIDTH, HEIGHT
-from .matrixanimation import MatrixAnimation
+from badgelib.debug import IS_DEBUG, log
+from badgelib.messages import loser_sprite
+from badgelib.messages import winner_sprite
+from badgelib.messages import kolab_bordered_sprite
+from badgelib.matrixanimation import MatrixAnimation, FPS as MATRIX_FPS
+from badgelib.bitgrid import BitGrid
+from badgelib.framebuffer import rgba_to_hex, reset_buffer, set_pixel, render_image_buffer, flush_stats, WIDTH, HEIGHT
+from badgelib.sensors import accel_service
+from badgelib.profiler import Profiler, UPDATE, BUFFER, FLUSH, SENSOR
+from badgelib.runtime import Runtime
+from badgelib.clock import ticks_ms, ticks_diff, ticks_add
 
 import random
-import time
-import accel
-import rgb
 import buttons
 
 # Setup RGB
 
 # Game variables
+FPS = 10
+# The block shows up this long after the board at the start of a game
+STARTUP_MS = 500
+runtime = Runtime()
+profiler = Profiler(report_every=100 if IS_DEBUG else 0)
+loop_count = 0
+# Win or loss screen while it is shown, else None
+animation = None
+hold_until = 0
 block_size = 1
 block_x, block_y = WIDTH // 2 - block_size // 2 - 1, HEIGHT // 2 - block_size // 2
-block_locations = [[False for _ in range(WIDTH)] for _ in range(HEIGHT)]
+block_locations = BitGrid()  # Cells the block has been on
 game_won = False
 game_lost = False
 
+# The board is the bordered KOLAB sprite, the rest of the screen stays dark
+letter_height = 8
+BOARD_X = 0
+BOARD_Y = (HEIGHT - letter_height) // 2
+BOARD_W = kolab_bordered_sprite.width
+BOARD_H = kolab_bordered_sprite.height
+text_mask = BitGrid.from_sprite(kolab_bordered_sprite, BOARD_X, BOARD_Y)
+sparkle_mask = BitGrid.from_sprite(kolab_bordered_sprite, BOARD_X, BOARD_Y, invert=True)
+TEXT_PIXELS = text_mask.count()
+SPARKLE_PIXELS = sparkle_mask.count()
+# Board pixels the block has not been on yet, the game is won when no text
+# pixel is left and lost when no sparkle pixel is left
+remaining_text = TEXT_PIXELS
+remaining_sparkle = SPARKLE_PIXELS
+
+RED = rgba_to_hex((255, 0, 0, 0xff))
+GREEN = rgba_to_hex((0, 255, 0, 0xff))
+DIM_GREEN = rgba_to_hex((0, 100, 0, 0xff))
+BLACK = rgba_to_hex((0, 0, 0, 0xff))
+WHITE = rgba_to_hex((255, 255, 255, 0))
+
 def reset():
     global game_won
     global game_lost
@@ -28,8 +60,10 @@ def reset():
     global block_x
     global block_y
     block_x, block_y = WIDTH // 2 - block_size // 2 - 1, HEIGHT // 2 - block_size // 2
-    global block_locations
-    block_locations = [[False for _ in range(WIDTH)] for _ in range(HEIGHT)]
+    global remaining_text, remaining_sparkle
+    block_locations.clear()
+    remaining_text = TEXT_PIXELS
+    remaining_sparkle = SPARKLE_PIXELS
     startup_sequence()
 
 
@@ -40,59 +74,39 @@ def random_rgba_color(max_value=255):
     return random.randint(0, max_value), random.randint(0, max_value), random.randint(0, max_value), 0xff
 
 
-def buffer_kolab_render(text_color=(255, 000, 000, 0xff), random_background=False):
-    global game_won
-    global game_lost
+def cell_color(x, y, text_color=RED):
+    """Color of the board at (x, y) without the block on it."""
+    if text_mask.get(x, y):
+        return GREEN if block_locations.get(x, y) else text_color
+    if sparkle_mask.get(x, y):
+        return BLACK if block_locations.get(x, y) else DIM_GREEN  # Turn off places where the block as been
+    return 0
 
-    letter_height = 8
-
-    x_start = 0
-    y_start = (HEIGHT - letter_height) // 2
-    img_width = len(kolab_message_bordered.split('\n')[1:][0])
-    img_height = len(kolab_message_bordered.split('\n')[1:])
-    # Initialize the data array to store color values for each pixel
-    data = [0] * (img_width * img_height)  # Initialize all pixels to black
-    found_unmasked_kolab_pixel = False
-    found_unmasked_sparkle_pixel = False
-    # Update the data array based on the message
-    for y, row in enumerate(kolab_message_bordered.split('\n')[1:]):  # Skip the first newline character
-        for x, char in enumerate(row):
-            index_in_img = (y) * img_width + (x)
-            global_y = y + y_start
-            global_x = x + x_start
-            if char == ' ':
-                if block_locations[global_y][global_x]:
-                    color = (0, 0, 0, 255)  # Turn off places where the block as been
-                else:
-                    found_unmasked_sparkle_pixel = True
-                    color = random_rgba_color(150) if random_background else (0, 100, 0, 0xff)
-            else:
-                if block_locations[global_y][global_x]:
-                    color = (0, 255, 0, 255)
-                else:
-                    found_unmasked_kolab_pixel = True
-                    color = text_color  # Assign text color
-
-            color_value = rgba_to_hex(color)
-            data[index_in_img] = color_value
-    if not found_unmasked_kolab_pixel:
-        game_won = True
-    if not found_unmasked_sparkle_pixel:
-        game_lost = True
 
-    return lambda: rgb.image(data, pos=(x_start, y_start), size=(img_width, img_height))
+def buffer_kolab_render(text_color=RED, random_background=False):
+    """Redraw the whole board, the game loop only updates the cells the block touches."""
+    reset_buffer()
+    # Update the frame buffer based on the message
+    for y in range(BOARD_H):
+        global_y = y + BOARD_Y
+        for x in range(BOARD_W):
+            global_x = x + BOARD_X
+            color = cell_color(global_x, global_y, text_color)
+            if random_background and color == DIM_GREEN:
+                color = rgba_to_hex(random_rgba_color(150))
+            set_pixel(global_x, global_y, color)
+
+    return render_image_buffer
 
 
 def draw_sparkles():
-    buffer_kolab_render((255, 0, 0, 0xff), True)()
+    buffer_kolab_render(RED, True)()
 
 
 def draw_block():
     for y in range(block_size):
         for x in range(block_size):
-            x1 = block_x + x
-            y1 = block_y + y
-            rgb.pixel((255, 255, 255), (x1, y1))
+            set_pixel(block_x + x, block_y + y, WHITE)
 
 
 def to_1or2(val50k, tresh):
@@ -101,65 +115,116 @@ def to_1or2(val50k, tresh):
     result = 1 if absval > tresh else 0
     return result if sign else -result
 
-def update_block_position():
+def visit(x, y):
+    """Mark a cell the block is on, counting down the board pixels left."""
+    global remaining_text, remaining_sparkle, game_won, game_lost
+    if block_locations.get(x, y):
+        return
+    block_locations.set(x, y)
+    if text_mask.get(x, y):
+        remaining_text -= 1
+        if remaining_text == 0:
+            game_won = True
+            if IS_DEBUG:
+                assert block_locations.covers(text_mask)
+    elif sparkle_mask.get(x, y):
+        remaining_sparkle -= 1
+        if remaining_sparkle == 0:
+            game_lost = True
+            if IS_DEBUG:
+                assert block_locations.covers(sparkle_mask)
+
+
+def update_block_position(ax, ay):
     global block_x, block_y
 
-    if accel:
-        ax, ay, _ = accel.get_xyz()
-        # Adjust sensitivity as needed
-        # print('ay', ay)
+    # Adjust sensitivity as needed
+    # print('ay', ay)
 
-        dx = to_1or2(ax, 10000)
-        dy = to_1or2(ay, 5000)
-        # print('dx', dx)
+    dx = to_1or2(ax, 10000)
+    dy = to_1or2(ay, 5000)
+    # print('dx', dx)
 
-        new_x = max(0, min(WIDTH - block_size, block_x - dx))
-        new_y = max(0, min(HEIGHT - block_size, block_y - dy))
+    new_x = max(0, min(WIDTH - block_size, block_x - dx))
+    new_y = max(0, min(HEIGHT - block_size, block_y - dy))
 
-        # Update sparkles
+    if new_x != block_x or new_y != block_y:
+        # Put the board back where the block was, draw_block() draws it at the new place
         for y in range(block_size):
             for x in range(block_size):
-                if not block_locations[new_y + y][new_x + x]:
-                    # print('marking block location: ' + str(new_y + y) + ', ' + str(new_x + x))
-                    block_locations[new_y + y][new_x + x] = True
+                set_pixel(block_x + x, block_y + y, cell_color(block_x + x, block_y + y))
+
+    # Update sparkles
+    for y in range(block_size):
+        for x in range(block_size):
+            visit(new_x + x, new_y + y)
 
-        block_x, block_y = new_x, new_y
+    block_x, block_y = new_x, new_y
 
 
 def main():
     log("[START] main()")
     if IS_DEBUG: setup_button_callback()
     startup_sequence()
-    accel.init()
-    loop_count = 0
-    while True:
-        game_loop()
-        loop_count += 1
-        if loop_count % 100 == 0:
-            log(f"Main loop iteration: {loop_count}")
-
-
-def game_loop():
-    if game_won:
-        MatrixAnimation(winner_message).show_loop(lambda: game_won)
+    service = accel_service()  # Initialises the sensor and starts sampling
+    if service.timer is None:
+        # No hardware timer to sample from, a task does it instead
+        runtime.every(service.period_ms, service.sample)
+    runtime.every(1000 // FPS, update)
+    runtime.render(FPS, render)
+    runtime.run()
+
+
+def holding():
+    return ticks_diff(hold_until, ticks_ms()) > 0
+
+
+def update():
+    if game_won or game_lost or holding():
         return
-    if game_lost:
-        MatrixAnimation(loser_message).show_loop(lambda: game_lost)
+    profiler.begin(SENSOR)
+    ax, ay, _ = accel_service().get_xyz()  # Latest filtered sample, no I2C here
+    profiler.end(SENSOR)
+    profiler.begin(UPDATE)
+    update_block_position(ax, ay)
+    profiler.end(UPDATE)
+
+
+def render():
+    global animation, loop_count
+    if game_won or game_lost:
+        if animation is None:
+            animation = MatrixAnimation(winner_sprite if game_won else loser_sprite)
+            animation.start()
+            runtime.set_fps(MATRIX_FPS)
+        animation.frame()
         return
-    render_kolab= buffer_kolab_render()
-    rgb.clear()
-    render_kolab()
+    if animation is not None:
+        # The animation drew over the board
+        animation = None
+        runtime.set_fps(FPS)
+        buffer_kolab_render()
+    if holding():
+        return
+    profiler.begin(BUFFER)
     # draw_sparkles()
-    update_block_position()
     draw_block()
-    time.sleep(0.1)  # Add a small delay to prevent the loop from running too fast
+    profiler.end(BUFFER)
+    profiler.begin(FLUSH)
+    render_image_buffer()
+    profiler.end(FLUSH)
+    profiler.frame_done()
+    loop_count += 1
+    if loop_count % 100 == 0:
+        log(f"Main loop iteration: {loop_count}, {flush_stats()}, {runtime.stats()}")
 
 
 def startup_sequence():
+    global hold_until
     # fill(0, 0, 0)
-    buffer_kolab_render()()
-    time.sleep(0.5)
-    draw_block()
+    render_kolab = buffer_kolab_render()
+    render_kolab()
+    hold_until = ticks_add(ticks_ms(), STARTUP_MS)
 
 
 def handle_button_press(down: bool, button: str):
@@ -181,11 +246,11 @@ def force_game_lost(down):
         game_lost = True
 
 def setup_button_callback():
-    buttons.register(buttons.BTN_A, lambda down: handle_button_press(down, 'A'))
-    buttons.register(buttons.BTN_UP, lambda down: handle_button_press(down, 'UP'))
-    buttons.register(buttons.BTN_DOWN, lambda down: handle_button_press(down, 'DOWN'))
-    buttons.register(buttons.BTN_LEFT, force_game_lost)
-    buttons.register(buttons.BTN_RIGHT, force_game_won)
+    runtime.on_button(buttons.BTN_A, lambda down: handle_button_press(down, 'A'))
+    runtime.on_button(buttons.BTN_UP, lambda down: handle_button_press(down, 'UP'))
+    runtime.on_button(buttons.BTN_DOWN, lambda down: handle_button_press(down, 'DOWN'))
+    runtime.on_button(buttons.BTN_LEFT, force_game_lost)
+    runtime.on_button(buttons.BTN_RIGHT, force_game_won)
 
 
 if __name__ == "__main__":
@@ -1,36 +0,0 @@
-kolab_message = [
-    " K   K  OOO     L    AA  BBB  ",
-    " K  K  O   O    L   A  A B  B ",
-    " KKK   O   O -- L   AAAA BBB  ",
-    " K  K  O   O    L   A  A B  B ",
-    " K   K  OOO     LLL A  A BBB  "
-]
-
-winner_message = kolab_message
-
-kolab_message_bordered = """
-|IIIIIIIIIIIIIIIIIIIIIIIIIIIIII|
-|                              |
-| K   K  OOO     L    AA  BBB  |
-| K  K  O   O    L   A  A B  B |
-| KKK   O   O -- L   AAAA BBB  |
-| K  K  O   O    L   A  A B  B |
-| K   K  OOO     LLL A  A BBB  |
-|                              |
-|IIIIIIIIIIIIIIIIIIIIIIIIIIIIII|"""
-
-loser_message = [
-    " L     OOO    SSS  EEEE RRR   ",
-    " L    O   O  S     E    R  R  ",
-    " L    O   O   SS   EEEE RRR   ",
-    " L    O   O     S  E    R R   ",
-    " LLLL  OOO   SSS   EEEE R  R  "
-]
-
-brucon_message = [
-    "BBB  RRR  U  U  CC  OO  N   N",
-    "B  B R  R U  U C   O  O NN  N",
-    "BBB  RRR  U  U C   O  O N N N",
-    "B  B R R  U  U C   O  O N  NN",
-    "BBB  R  R UUUU  CC  OO  N   N"
-]
@@ -1,5 +0,0 @@
-# IS_DEBUG = False
-IS_DEBUG = True
-
-def log(message):
-    if IS_DEBUG: print(message)
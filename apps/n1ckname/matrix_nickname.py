@@ -1,6 +1,12 @@
 import nvs
-from .messages import kolab_message
-from .matrixanimation import MatrixAnimation
+import rgb
+from badgelib.matrixanimation import MatrixAnimation, FPS
+from badgelib.runtime import Runtime
+
+RED = (255, 0, 0)
+GREEN = (0, 255, 0)
+
+
 def main():
     # kolab_game_state = nvs.get_str("system", 'kolab_game_state')
     kolab_game_state='won'
@@ -11,18 +17,11 @@ def main():
    #
    # elif kolab_game_state != 'won':
    #      nickname = 'Ko-Lab'
-   #  gif, pos, size,  frames = calc_matrix_gif()
-   #  rgb.gif(gif, pos, size, frames)
    #  rgb.text(nickname)
-    MatrixAnimation(None).show_loop()
-
-def calc_matrix_gif():
-    frames = 5
-    gifdata =[]
-    for i in range(frames):
-       gifdata = gifdata + get_matrix_frame(i)
-    return gifdata, (0,0), (32, 19), frames
-
-def get_matrix_frame(i):
-    cyan_columns = calc_cyan_columns()
-    return buffer_matrix_frame(cyan_columns)
\ No newline at end of file
+    # Red rain under the nickname, drawn by the firmware after every frame
+    animation = MatrixAnimation(message=None, color=RED, brightness=7, follow_accel=False,
+                                overlay=lambda: rgb.text(nickname, color=GREEN))
+    animation.start()
+    runtime = Runtime()
+    runtime.render(FPS, animation.frame)
+    runtime.run()
@@ -1,67 +1,95 @@
 ### North Star AGY - Professional 4-pointed star with Flappy Bird
 import random
-import time
+from array import array
 import rgb
 import buttons
-
-WIDTH, HEIGHT = 32, 19
-image_buffer = [0] * (WIDTH * HEIGHT)
-
-def rgb_to_hex(color):
-    (r, g, b) = color
-    return rgba_to_hex((r, g, b, 0))
-
-def rgba_to_hex(color):
-    (r, g, b, alpha) = color
-    color_value = (r << 24) | (g << 16) | (b << 8) | alpha
-    return color_value
-
-def reset_buffer():
-    global image_buffer
-    for i in range(len(image_buffer)):
-        image_buffer[i] = 0
-
-def prepare_pixel_global(pos, color):
-    global image_buffer
-    (posx, posy) = pos
-    hex_color = rgb_to_hex(color)
-    i = posy * WIDTH + posx
-    image_buffer[i] = hex_color
-
-def render_image_buffer():
-    rgb.image(image_buffer, pos=(0, 0), size=(WIDTH, HEIGHT))
+from badgelib.clock import ticks_ms, ticks_diff
+from badgelib.debug import IS_DEBUG, log
+from badgelib.runtime import Runtime
+from badgelib.sensors import battery_service
+from badgelib.framebuffer import (rgb_to_hex, reset_buffer, set_pixel, set_many, hline, vline, read_rect,
+                                  invalidate, render_image_buffer, flush_stats, WIDTH, HEIGHT)
+
+# Packed colors
+WHITE = rgb_to_hex((255, 255, 255))
+GREY = rgb_to_hex((100, 100, 100))
+RED = rgb_to_hex((255, 0, 0))
+GREEN = rgb_to_hex((0, 255, 0))
+BLUE = rgb_to_hex((0, 0, 255))
+YELLOW = rgb_to_hex((255, 255, 0))
+ORANGE = rgb_to_hex((255, 165, 0))
+MAGENTA = rgb_to_hex((255, 0, 255))
 
 # Star animation variables
 frame = 0
+FPS = 16  # Slower ~16 FPS for more relaxed gameplay
+FRAME_MS = 1000 // FPS
+runtime = Runtime()
+STAR_CYCLE_FRAMES = 80  # Star grows and shrinks once per 80 frames
+COLOR_CYCLE_FRAMES = 160  # Color changes every 2 star cycles
+
+# Idle star animation, played by the firmware with rgb.gif
+# The box covers the star at its biggest plus the battery indicator above it.
+STAR_GIF_X, STAR_GIF_Y, STAR_GIF_W, STAR_GIF_H = 17, 0, 15, 16
+STAR_GIF_FRAMES = 24  # Samples per star cycle, 80 frames at 16 FPS / 24 = ~200 ms each
+STAR_GIF_FPS = 5
+STAR_GIF_CYCLE_MS = STAR_GIF_FRAMES * 1000 // STAR_GIF_FPS
+# The color changes after 2 whole gif cycles, never in the middle of one
+COLOR_CYCLE_MS = 2 * STAR_GIF_CYCLE_MS
+# The gif animates itself, only wake up once per gif frame so the color
+# change lands on the end of a cycle
+IDLE_FPS = STAR_GIF_FPS
+# About 23 KB, only allocated while the idle star is shown
+star_gif = None
 
 # Flappy Bird game variables
 flappy_active = False
-bird_y = HEIGHT // 2
+idle_shown = False
+idle_since = 0
+render_count = 0
+# Bird position and velocity in 1/256 pixel (per frame)
+FP_SHIFT = 8
+FP_ONE = 1 << FP_SHIFT
+GRAVITY = FP_ONE // 4  # Faster falling
+FLAP_VELOCITY = -2 * FP_ONE
+BIRD_X = 2
+bird_y = (HEIGHT // 2) << FP_SHIFT
 bird_velocity = 0
-obstacles = []
 score = 0
 game_over = False
 
-# Battery indicator - try multiple methods
-battery_method = None
-battery_value = 0
-try:
-    import battery
-    battery_method = "battery"
-    print("Using battery module")
-except ImportError:
-    try:
-        import machine
-        battery_method = "machine"
-        print("Using machine module")
-    except ImportError:
-        try:
-            from machine import ADC, Pin
-            battery_method = "adc"
-            print("Using ADC for battery")
-        except ImportError:
-            battery_method = None
-            print("No battery method available")
+# Obstacles, a ring of at most MAX_OBSTACLES in spawn order so the oldest
+# (leftmost) one is at obstacle_head
+GAP_SIZE = 4
+SPAWN_FRAMES = 40  # A new obstacle every 40 frames (slower)
+# One lives WIDTH + 2 frames, from x = WIDTH until it is dropped at x = -2,
+# and one spawns every SPAWN_FRAMES. frame wrapping from 1000 to 0 spawns
+# two in a row, one more than the spacing allows.
+MAX_OBSTACLES = (WIDTH + 2 + SPAWN_FRAMES - 1) // SPAWN_FRAMES + 1
+obstacle_x = array('b', [0] * MAX_OBSTACLES)
+obstacle_gap = bytearray(MAX_OBSTACLES)  # Top row of the gap
+obstacle_head = 0
+obstacle_count = 0
+# Gap top of the obstacle in each column, NO_GAP where there is none
+NO_GAP = 255
+gap_at = bytearray([NO_GAP] * WIDTH)
+
+# Battery indicator, sampled in the background by the shared service
+battery_monitor = battery_service()
+battery_method = battery_monitor.backend
+
+def star_size_at(frame):
+    """Star size (1 to 6, growing and shrinking) at a frame"""
+    cycle = frame % STAR_CYCLE_FRAMES  # 80 frame cycle for smooth animation
+    if cycle < 40:
+        star_size = 1 + (cycle // 7)  # Grow from 1 to 6
+    else:
+        star_size = 6 - ((cycle - 40) // 7)  # Shrink from 6 to 1
+
+    # Ensure minimum size of 1
+    if star_size < 1:
+        star_size = 1
+    return star_size
 
 def draw_four_pointed_star(size, color_cycle):
     """Draw a classic 4-pointed North Star with empty center"""
@@ -79,6 +107,7 @@ def draw_four_pointed_star(size, color_cycle):
         star_color = (0, brightness, int(brightness * 0.4))
     else:  # White
         star_color = (brightness, brightness, brightness)
+    star_color = rgb_to_hex(star_color)
 
     # NO CENTER POINT - keep it empty/hollow
 
@@ -86,19 +115,19 @@ def draw_four_pointed_star(size, color_cycle):
     for i in range(1, size + 1):
         # North point (up)
         if center_y - i >= 0:
-            prepare_pixel_global((center_x, center_y - i), star_color)
+            set_pixel(center_x, center_y - i, star_color)
 
         # South point (down) - go all the way down but avoid NS2 text area
         if center_y + i < HEIGHT - 5 or (center_y + i < HEIGHT and center_x > 20):
-            prepare_pixel_global((center_x, center_y + i), star_color)
+            set_pixel(center_x, center_y + i, star_color)
 
         # East point (right)
         if center_x + i < WIDTH:
-            prepare_pixel_global((center_x + i, center_y), star_color)
+            set_pixel(center_x + i, center_y, star_color)
 
         # West point (left)
         if center_x - i >= 0:
-            prepare_pixel_global((center_x - i, center_y), star_color)
+            set_pixel(center_x - i, center_y, star_color)
 
     # Add hollow diamond outline for bigger stars (no center fill)
     if size >= 3:
@@ -111,7 +140,7 @@ def draw_four_pointed_star(size, color_cycle):
         ]
         for x, y in diamond_outline:
             if 0 <= x < WIDTH and (y < HEIGHT - 5 or (y < HEIGHT and x > 20)):
-                prepare_pixel_global((x, y), star_color)
+                set_pixel(x, y, star_color)
 
     # Add star tips for bigger stars
     if size >= 4:
@@ -119,26 +148,26 @@ def draw_four_pointed_star(size, color_cycle):
         tip_brightness = int(brightness * 1.2)
         if tip_brightness > 255:
             tip_brightness = 255
-        tip_color = (tip_brightness, int(tip_brightness * 0.8), 0)
+        tip_color = rgb_to_hex((tip_brightness, int(tip_brightness * 0.8), 0))
 
         # North tip
         if center_y - size - 1 >= 0:
-            prepare_pixel_global((center_x, center_y - size - 1), tip_color)
+            set_pixel(center_x, center_y - size - 1, tip_color)
 
         # South tip - can extend further down on right side
         if center_y + size + 1 < HEIGHT - 5 or (center_y + size + 1 < HEIGHT and center_x > 20):
-            prepare_pixel_global((center_x, center_y + size + 1), tip_color)
+            set_pixel(center_x, center_y + size + 1, tip_color)
 
         # East tip
         if center_x + size + 1 < WIDTH:
-            prepare_pixel_global((center_x + size + 1, center_y), tip_color)
+            set_pixel(center_x + size + 1, center_y, tip_color)
 
         # West tip
         if center_x - size - 1 >= 0:
-            prepare_pixel_global((center_x - size - 1, center_y), tip_color)
+            set_pixel(center_x - size - 1, center_y, tip_color)
 
-def draw_ns2_text():
-    """Draw NS2 text on left side with more space"""
+def ns2_text_indices():
+    """Linear buffer indices of the NS2 text on left side with more space"""
     # N (4x5 pixels) - bigger and clearer
     n_pixels = [
         (2, HEIGHT-5), (2, HEIGHT-4), (2, HEIGHT-3), (2, HEIGHT-2), (2, HEIGHT-1),  # left column
@@ -164,53 +193,24 @@ def draw_ns2_text():
         (14, HEIGHT-1), (15, HEIGHT-1), (16, HEIGHT-1), (17, HEIGHT-1),  # bottom row
     ]
 
-    # Draw all letters in white
     all_pixels = n_pixels + s_pixels + two_pixels
-    for x, y in all_pixels:
-        if 0 <= x < WIDTH and 0 <= y < HEIGHT:
-            prepare_pixel_global((x, y), (255, 255, 255))
+    return [y * WIDTH + x for x, y in all_pixels if 0 <= x < WIDTH and 0 <= y < HEIGHT]
+
+
+NS2_INDICES = ns2_text_indices()
+
+
+def draw_ns2_text():
+    """Draw NS2 text on left side with more space"""
+    # Draw all letters in white
+    set_many(NS2_INDICES, WHITE)
 
 def get_battery_level():
-    """Get battery level using available method"""
-    global battery_value
-
-    if battery_method == "battery":
-        try:
-            import battery
-            battery_value = battery.read_batt_percentage()
-            return battery_value
-        except:
-            pass
-    elif battery_method == "machine":
-        try:
-            import machine
-            # Try different ADC pins commonly used for battery
-            adc = machine.ADC(0)  # Try pin 0
-            raw = adc.read_u16()
-            # Convert to percentage (this is approximate)
-            battery_value = int((raw / 65535) * 100)
-            return battery_value
-        except:
-            try:
-                adc = machine.ADC(4)  # Try pin 4
-                raw = adc.read_u16()
-                battery_value = int((raw / 65535) * 100)
-                return battery_value
-            except:
-                pass
-    elif battery_method == "adc":
-        try:
-            from machine import ADC
-            adc = ADC(0)
-            raw = adc.read_u16()
-            battery_value = int((raw / 65535) * 100)
-            return battery_value
-        except:
-            pass
-
-    # Fallback - simulate battery level based on time for testing
-    battery_value = 50 + int(30 * ((frame // 100) % 10) / 10)
-    return battery_value
+    """Cached battery level, never touches the ADC"""
+    if battery_method is None:
+        # Fallback - simulate battery level based on time for testing
+        return 50 + int(30 * ((frame // 100) % 10) / 10)
+    return battery_monitor.level()
 
 def draw_battery_indicator():
     """Draw battery indicator in top right corner"""
@@ -221,152 +221,155 @@ def draw_battery_indicator():
         battery_x, battery_y = WIDTH - 5, 0
 
         # Draw battery outline (4x3 pixels)
-        outline_color = (100, 100, 100)
+        outline_color = GREY
 
         # Main battery body
-        prepare_pixel_global((battery_x, battery_y), outline_color)      # top left
-        prepare_pixel_global((battery_x + 1, battery_y), outline_color)  # top middle
-        prepare_pixel_global((battery_x + 2, battery_y), outline_color)  # top right
-        prepare_pixel_global((battery_x, battery_y + 1), outline_color)  # middle left
-        prepare_pixel_global((battery_x + 2, battery_y + 1), outline_color)  # middle right
-        prepare_pixel_global((battery_x, battery_y + 2), outline_color)  # bottom left
-        prepare_pixel_global((battery_x + 1, battery_y + 2), outline_color)  # bottom middle
-        prepare_pixel_global((battery_x + 2, battery_y + 2), outline_color)  # bottom right
+        set_pixel(battery_x, battery_y, outline_color)      # top left
+        set_pixel(battery_x + 1, battery_y, outline_color)  # top middle
+        set_pixel(battery_x + 2, battery_y, outline_color)  # top right
+        set_pixel(battery_x, battery_y + 1, outline_color)  # middle left
+        set_pixel(battery_x + 2, battery_y + 1, outline_color)  # middle right
+        set_pixel(battery_x, battery_y + 2, outline_color)  # bottom left
+        set_pixel(battery_x + 1, battery_y + 2, outline_color)  # bottom middle
+        set_pixel(battery_x + 2, battery_y + 2, outline_color)  # bottom right
 
         # Battery tip
-        prepare_pixel_global((battery_x + 3, battery_y + 1), outline_color)
+        set_pixel(battery_x + 3, battery_y + 1, outline_color)
 
         # Fill based on battery level with proper colors
         if battery_percent > 60:
-            fill_color = (0, 255, 0)  # Green
+            fill_color = GREEN  # Green
         elif battery_percent > 30:
-            fill_color = (255, 255, 0)  # Yellow
+            fill_color = YELLOW  # Yellow
         elif battery_percent > 15:
-            fill_color = (255, 165, 0)  # Orange
+            fill_color = ORANGE  # Orange
         else:
-            fill_color = (255, 0, 0)  # Red
+            fill_color = RED  # Red
 
         # Fill bars based on level
         if battery_percent > 20:
-            prepare_pixel_global((battery_x + 1, battery_y + 1), fill_color)
+            set_pixel(battery_x + 1, battery_y + 1, fill_color)
         if battery_percent > 50:
-            prepare_pixel_global((battery_x + 1, battery_y + 1), fill_color)
+            set_pixel(battery_x + 1, battery_y + 1, fill_color)
             # Add tip blink for high battery
             if (frame // 15) % 2 == 0:
-                prepare_pixel_global((battery_x + 3, battery_y + 1), fill_color)
+                set_pixel(battery_x + 3, battery_y + 1, fill_color)
 
         # Show battery method in corner for debugging
         if battery_method:
             # Blink different colors based on method
             if battery_method == "battery" and (frame // 10) % 2:
-                prepare_pixel_global((WIDTH - 1, HEIGHT - 1), (0, 255, 0))  # green = real battery
+                set_pixel(WIDTH - 1, HEIGHT - 1, GREEN)  # green = real battery
             elif battery_method == "machine" and (frame // 10) % 2:
-                prepare_pixel_global((WIDTH - 1, HEIGHT - 1), (0, 0, 255))  # blue = machine ADC
-            elif battery_method == "adc" and (frame // 10) % 2:
-                prepare_pixel_global((WIDTH - 1, HEIGHT - 1), (255, 255, 0))  # yellow = raw ADC
+                set_pixel(WIDTH - 1, HEIGHT - 1, BLUE)  # blue = machine ADC
         else:
             # Red blink = no battery method (using simulation)
             if (frame // 10) % 2:
-                prepare_pixel_global((WIDTH - 1, HEIGHT - 1), (255, 0, 0))
+                set_pixel(WIDTH - 1, HEIGHT - 1, RED)
 
     except Exception as e:
         # Show error indicator
-        prepare_pixel_global((WIDTH - 1, HEIGHT - 1), (255, 0, 255))  # magenta = error
-
-class Obstacle:
-    def __init__(self, x):
-        self.x = x
-        self.gap_y = random.randint(2, HEIGHT - 5)  # Gap position (full height)
-        self.gap_size = 4  # Gap size
-
-    def update(self):
-        self.x -= 1
-        return self.x > -2
-
-    def draw(self):
-        # Draw top obstacle
-        for y in range(0, self.gap_y):
-            if 0 <= self.x < WIDTH and 0 <= y < HEIGHT:
-                prepare_pixel_global((self.x, y), (0, 255, 0))
-
-        # Draw bottom obstacle
-        for y in range(self.gap_y + self.gap_size, HEIGHT):
-            if 0 <= self.x < WIDTH and 0 <= y < HEIGHT:
-                prepare_pixel_global((self.x, y), (0, 255, 0))
-
-    def check_collision(self, bird_y):
-        if self.x == 2:  # Bird is at x=2
-            if bird_y <= self.gap_y or bird_y >= self.gap_y + self.gap_size:
-                return True
-        return False
+        set_pixel(WIDTH - 1, HEIGHT - 1, MAGENTA)  # magenta = error
+
+def clear_obstacles():
+    global obstacle_head, obstacle_count
+    obstacle_head = 0
+    obstacle_count = 0
+    for x in range(WIDTH):
+        gap_at[x] = NO_GAP
+
+def move_obstacles():
+    """Shift every obstacle one column left, dropping the ones that left the screen"""
+    global obstacle_head, obstacle_count
+    i = obstacle_head
+    for _ in range(obstacle_count):
+        x = obstacle_x[i]
+        if 0 <= x < WIDTH:
+            gap_at[x] = NO_GAP
+        x -= 1
+        obstacle_x[i] = x
+        if 0 <= x < WIDTH:
+            gap_at[x] = obstacle_gap[i]
+        i = (i + 1) % MAX_OBSTACLES
+    while obstacle_count and obstacle_x[obstacle_head] <= -2:
+        obstacle_head = (obstacle_head + 1) % MAX_OBSTACLES
+        obstacle_count -= 1
+
+def spawn_obstacle():
+    global obstacle_count
+    if obstacle_count == MAX_OBSTACLES:
+        return
+    i = (obstacle_head + obstacle_count) % MAX_OBSTACLES
+    obstacle_x[i] = WIDTH
+    obstacle_gap[i] = random.randint(2, HEIGHT - 5)  # Gap position (full height)
+    obstacle_count += 1
 
 def update_flappy_bird():
     """Update flappy bird game state"""
-    global bird_y, bird_velocity, obstacles, score, game_over, flappy_active
+    global bird_y, bird_velocity, score, game_over
 
     if not flappy_active or game_over:
         return
 
-    # Apply gravity (faster falling)
-    bird_velocity += 0.25
+    # Apply gravity
+    bird_velocity += GRAVITY
     bird_y += bird_velocity
 
-    # Check bounds (full screen - top to bottom) - fix crash
+    # Check bounds (full screen - top to bottom)
     if bird_y <= 0:
         bird_y = 0
         bird_velocity = 0
         game_over = True
         return
-    if bird_y >= HEIGHT - 1:
-        bird_y = HEIGHT - 1
+    if bird_y >= (HEIGHT - 1) << FP_SHIFT:
+        bird_y = (HEIGHT - 1) << FP_SHIFT
         bird_velocity = 0
         game_over = True
         return
 
     # Update obstacles
-    obstacles = [obs for obs in obstacles if obs.update()]
+    move_obstacles()
 
-    # Add new obstacles (slower)
-    if frame % 40 == 0:  # Every 40 frames (slower)
-        obstacles.append(Obstacle(WIDTH))
+    # Add new obstacles
+    if frame % SPAWN_FRAMES == 0:
+        spawn_obstacle()
 
-    # Check collisions
-    for obs in obstacles:
-        if obs.check_collision(bird_y):
+    # Check collisions against the gap in the bird's column
+    gap = gap_at[BIRD_X]
+    if gap != NO_GAP:
+        if bird_y <= gap << FP_SHIFT or bird_y >= (gap + GAP_SIZE) << FP_SHIFT:
             game_over = True
             return
 
-        # Score when passing obstacle
-        if obs.x == 1:
-            score += 1
+    # Score when passing obstacle
+    if gap_at[BIRD_X - 1] != NO_GAP:
+        score += 1
 
 def draw_flappy_bird():
     """Draw flappy bird game"""
     if not flappy_active:
         return
 
-    # Draw bird (small yellow square at x=2) - full height allowed
-    bird_color = (255, 255, 0)
-    safe_bird_y = max(0, min(int(bird_y), HEIGHT - 1))  # Clamp bird position
-    prepare_pixel_global((2, safe_bird_y), bird_color)
-
-    # Draw obstacles
-    for obs in obstacles:
-        obs.draw()
+    # Draw obstacles, a column fill above and below the gap
+    i = obstacle_head
+    for _ in range(obstacle_count):
+        x = obstacle_x[i]
+        gap = obstacle_gap[i]
+        vline(x, 0, gap, GREEN)
+        vline(x, gap + GAP_SIZE, HEIGHT - gap - GAP_SIZE, GREEN)
+        i = (i + 1) % MAX_OBSTACLES
 
     # Draw score (simple dots in top left)
-    for i in range(min(score, 5)):  # Max 5 dots
-        prepare_pixel_global((i, 0), (255, 255, 255))
+    hline(0, 0, min(score, 5), WHITE)  # Max 5 dots
 
-    # Game over message
-    if game_over:
-        # Draw simple "X" at bird position (safe bounds)
-        safe_bird_y = max(0, min(int(bird_y), HEIGHT - 1))
-        prepare_pixel_global((2, safe_bird_y), (255, 0, 0))
+    # Draw bird (small square at BIRD_X, red once it crashed) - the bounds
+    # check keeps it on screen. Drawn last, it is only over an obstacle
+    # when it crashed into it.
+    set_pixel(BIRD_X, bird_y >> FP_SHIFT, RED if game_over else YELLOW)
 
 def handle_button_press(down, button):
     """Handle button presses"""
-    global flappy_active, bird_velocity, game_over, bird_y, obstacles, score
+    global flappy_active, bird_velocity, game_over, bird_y, score
 
     if not down:  # Only on button press, not release
         return
@@ -375,21 +378,21 @@ def handle_button_press(down, button):
         if not flappy_active:
             # Start flappy bird game
             flappy_active = True
-            bird_y = HEIGHT // 2
+            bird_y = (HEIGHT // 2) << FP_SHIFT
             bird_velocity = 0
-            obstacles = []
+            clear_obstacles()
             score = 0
             game_over = False
         elif game_over:
             # Restart game
-            bird_y = HEIGHT // 2
+            bird_y = (HEIGHT // 2) << FP_SHIFT
             bird_velocity = 0
-            obstacles = []
+            clear_obstacles()
             score = 0
             game_over = False
         else:
             # Flap (jump up) - stronger jump to counteract faster gravity
-            bird_velocity = -2.0
+            bird_velocity = FLAP_VELOCITY
 
     elif button == 'LEFT' and flappy_active:
         # Exit flappy bird game
@@ -398,57 +401,89 @@ def handle_button_press(down, button):
 
 def setup_buttons():
     """Setup button handlers"""
-    buttons.register(buttons.BTN_RIGHT, lambda down: handle_button_press(down, 'RIGHT'))
-    buttons.register(buttons.BTN_LEFT, lambda down: handle_button_press(down, 'LEFT'))
-    buttons.register(buttons.BTN_UP, lambda down: handle_button_press(down, 'RIGHT') if flappy_active else None)
-    buttons.register(buttons.BTN_A, lambda down: handle_button_press(down, 'RIGHT') if flappy_active else None)
-
-def main():
-    global frame
-
-    # Setup button handlers
-    setup_buttons()
-
-    while True:
+    runtime.on_button(buttons.BTN_RIGHT, lambda down: handle_button_press(down, 'RIGHT'))
+    runtime.on_button(buttons.BTN_LEFT, lambda down: handle_button_press(down, 'LEFT'))
+    runtime.on_button(buttons.BTN_UP, lambda down: handle_button_press(down, 'RIGHT') if flappy_active else None)
+    runtime.on_button(buttons.BTN_A, lambda down: handle_button_press(down, 'RIGHT') if flappy_active else None)
+
+def render_star_gif(color_cycle):
+    """Render one star cycle in the given color into star_gif"""
+    global star_gif
+    if star_gif is None:
+        star_gif = array('I', [0] * (STAR_GIF_W * STAR_GIF_H * STAR_GIF_FRAMES))
+    offset = 0
+    for i in range(STAR_GIF_FRAMES):
         reset_buffer()
+        draw_four_pointed_star(star_size_at(i * STAR_CYCLE_FRAMES // STAR_GIF_FRAMES), color_cycle)
+        draw_battery_indicator()
+        offset = read_rect(STAR_GIF_X, STAR_GIF_Y, STAR_GIF_W, STAR_GIF_H, star_gif, offset)
+
+def show_idle_animation():
+    """Hand one color of the star animation to the firmware"""
+    global idle_since
+    # The gif only holds one color, the render task switches color (and refreshes the battery)
+    render_star_gif((frame // COLOR_CYCLE_FRAMES) % 5)
+    reset_buffer()
+    draw_ns2_text()
+    draw_battery_indicator()
+    render_image_buffer()
+    rgb.framerate(STAR_GIF_FPS)
+    rgb.gif(star_gif, (STAR_GIF_X, STAR_GIF_Y), (STAR_GIF_W, STAR_GIF_H), STAR_GIF_FRAMES)
+    idle_since = ticks_ms()
+
+def update():
+    """Advance flappy bird by one frame"""
+    global frame
+    if not flappy_active:
+        return
 
-        # Update flappy bird game
-        update_flappy_bird()
-
-        # Show animated star when flappy bird is not active
-        if not flappy_active:
-            # Calculate star size (1 to 6, growing and shrinking) - animated again
-            cycle = frame % 80  # 80 frame cycle for smooth animation
-            if cycle < 40:
-                star_size = 1 + (cycle // 7)  # Grow from 1 to 6
-            else:
-                star_size = 6 - ((cycle - 40) // 7)  # Shrink from 6 to 1
+    # Update flappy bird game
+    update_flappy_bird()
 
-            # Ensure minimum size of 1
-            if star_size < 1:
-                star_size = 1
+    frame += 1
+    if frame > 1000:
+        frame = 0
 
-            # Color cycle - changes every full size cycle (160 frames)
-            color_cycle = (frame // 160) % 5  # 5 different colors
+def render():
+    global frame, idle_shown, render_count, star_gif
+    if not flappy_active:
+        if not idle_shown:
+            show_idle_animation()
+            idle_shown = True
+            runtime.set_fps(IDLE_FPS)
+        elif ticks_diff(ticks_ms(), idle_since) >= COLOR_CYCLE_MS:
+            frame = (frame + COLOR_CYCLE_FRAMES) % 1000
+            show_idle_animation()
+        return
+    if idle_shown:
+        # Stop the gif, the game draws the whole screen again
+        rgb.clear()
+        rgb.framerate(FPS)
+        invalidate()
+        # Rebuilt when the game is left
+        star_gif = None
+        idle_shown = False
+        runtime.set_fps(FPS)
 
-            draw_four_pointed_star(star_size, color_cycle)
+    reset_buffer()
 
-        # Only draw NS2 text when flappy bird is not active (fullscreen mode)
-        if not flappy_active:
-            draw_ns2_text()
+    # Draw flappy bird game on top
+    draw_flappy_bird()
 
-        # Draw flappy bird game on top
-        draw_flappy_bird()
+    # Always draw battery indicator
+    draw_battery_indicator()
 
-        # Always draw battery indicator
-        draw_battery_indicator()
+    render_image_buffer()
+    render_count += 1
+    if IS_DEBUG and render_count % 100 == 0:
+        log('%s, %s' % (flush_stats(), runtime.stats()))
 
-        frame += 1
-        if frame > 1000:
-            frame = 0
+def main():
+    # Setup button handlers
+    setup_buttons()
 
-        time.sleep(0.06)  # Slower ~16 FPS for more relaxed gameplay
-        rgb.clear()
-        render_image_buffer()
+    runtime.every(FRAME_MS, update)
+    runtime.render(FPS, render)
+    runtime.run()
 
-main()
\ No newline at end of file
+main()
@@ -1,10 +1,7 @@
-try:
-    from .display_helper import WIDTH, HEIGHT
-except ImportError:
-    WIDTH, HEIGHT = 32, 19
+from badgelib.framebuffer import WIDTH, HEIGHT
 
-import time
 import rgb
+from badgelib.runtime import Runtime
 
 # Simple star pattern - just coordinates
 star_coords = [
@@ -20,6 +17,7 @@ star_coords = [
 
 # Animation counter
 frame = 0
+FPS = 10
 
 def draw_star():
     """Draw a simple pulsing star"""
@@ -82,33 +80,33 @@ def draw_north_star():
         if 0 <= x < WIDTH and 0 <= y < HEIGHT:
             rgb.pixel((0, 150, 255, 255), (x, y))
 
-def main():
-    """Main function - keep it super simple"""
+def draw_frame():
     global frame
 
-    # Clear screen once
+    # Clear screen
     rgb.clear()
 
-    # Main loop
-    while True:
-        # Clear screen
-        rgb.clear()
+    # Draw star
+    draw_star()
 
-        # Draw star
-        draw_star()
+    # Alternate text every 100 frames
+    if (frame // 100) % 2 == 0:
+        draw_ns2()
+    else:
+        draw_north_star()
 
-        # Alternate text every 100 frames
-        if (frame // 100) % 2 == 0:
-            draw_ns2()
-        else:
-            draw_north_star()
+    # Update frame
+    frame += 1
+    if frame > 1000:
+        frame = 0
 
-        # Update frame
-        frame += 1
-        if frame > 1000:
-            frame = 0
+def main():
+    """Main function - keep it super simple"""
+    # Clear screen once
+    rgb.clear()
 
-        # Wait
-        time.sleep(0.1)
+    runtime = Runtime()
+    runtime.render(FPS, draw_frame)
+    runtime.run()
 
-main()
\ No newline at end of file
+main()
@@ -1,54 +1,33 @@
 #!/usr/bin/env python3
 """
-Test script for North Star AGY game
+Test script for North Star AGY game, runs it in the emulator
+(from the repository root: python3 apps/northstar_agy/test_game.py)
 """
-
-# Mock the hardware modules for testing
-class MockRGB:
-    def clear(self):
-        print("RGB: Clear display")
-
-    def pixel(self, color, pos):
-        r, g, b, a = color
-        x, y = pos
-        print(f"RGB: Pixel at ({x},{y}) with color RGB({r},{g},{b})")
-
-    def image(self, data, pos, size):
-        print(f"RGB: Image at {pos} with size {size}")
-
-class MockButtons:
-    BTN_A = "A"
-    BTN_B = "B"
-
-    def register(self, button, callback):
-        print(f"Button {button} registered")
-
-# Replace the hardware modules with mocks
+import os
 import sys
-sys.modules['rgb'] = MockRGB()
-sys.modules['buttons'] = MockButtons()
-
-# Now test the game
-try:
-    from northstar_agy import main, draw_simple_star, draw_text_ns2, draw_text_northstar, draw_text_agy
-    print("✓ All imports successful!")
-    print("✓ Game modules loaded correctly")
-    print("✓ North Star AGY game is ready!")
-
-    # Test some core functions
-    print("\n--- Testing star drawing ---")
-    draw_simple_star()
-
-    print("\n--- Testing NS2 text ---")
-    draw_text_ns2()
-
-    print("\n--- Testing company name display ---")
-    draw_text_northstar()
-    draw_text_agy()
-
-    print("\n🌟 North Star AGY animation game ready for badge!")
 
-except Exception as e:
-    print(f"❌ Error testing game: {e}")
-    import traceback
-    traceback.print_exc()
\ No newline at end of file
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from emulator import Emulator
+
+# Idle animation only
+idle = Emulator()
+result = idle.run('northstar_agy', seconds=20)
+print(result)
+assert result.reason == 'timeout', result.reason
+assert idle.rgb.gif_calls > 0, "idle animation was not started"
+print("✓ Idle animation runs")
+
+# Start flappy and keep flapping
+game = Emulator()
+game.tap(1000, 'RIGHT')
+for t in range(1500, 30000, 400):
+    game.tap(t, 'UP')
+result = game.run('northstar_agy', seconds=30)
+print(result)
+assert result.reason == 'timeout', result.reason
+assert result.image_calls > 0, "flappy never drew a frame"
+print("✓ Flappy runs")
+print(game.rgb.to_ascii())
+
+print("\n🌟 North Star AGY animation game ready for badge!")
@@ -1,8 +1,11 @@
 import rgb, buttons, system, uinterface
 from random import randint
-from time import sleep
+from badgelib.framebuffer import rgb_to_hex, reset_buffer, set_pixel, render_image_buffer
+from badgelib.runtime import Runtime
 
 
+FPS = 10
+
 UP, DOWN, LEFT, RIGHT = buttons.BTN_UP, buttons.BTN_DOWN, buttons.BTN_LEFT, buttons.BTN_RIGHT
 
 can_move = True
@@ -13,14 +16,17 @@ score = 0
 snake = [(10, 4), (8, 4), (9, 4)]
 food = (24, 6)
 
+SNAKE_COLOR = rgb_to_hex((255, 255, 255))
+FOOD_COLOR = rgb_to_hex((0, 255, 200))
+
 def bA():
-    # rgb.clear()
-    rgb.background((0,0,0))
+    reset_buffer()
 
     for x,y in snake:
-        rgb.pixel((255, 255, 255), (x, y))
+        set_pixel(x, y, SNAKE_COLOR)
 
-    rgb.pixel((0, 255, 200), food)
+    set_pixel(food[0], food[1], FOOD_COLOR)
+    render_image_buffer()
 
 
 def input_up(pressed):
@@ -56,18 +62,11 @@ def input_right(pressed):
 
 
 def input_B(pressed):
-    global next_direction
-    next_direction = buttons.BTN_B
-
+    runtime.stop()
 
-buttons.register(UP, input_up)
-buttons.register(DOWN, input_down)
-buttons.register(LEFT, input_left)
-buttons.register(RIGHT, input_right)
-buttons.register(buttons.BTN_B, input_B)
-
-while next_direction != buttons.BTN_B:
 
+def step():
+    global food, score, cur_direction
     cur_x, cur_y = snake[0]
     new_x, new_y = (cur_x + (1 if next_direction == RIGHT else (-1 if next_direction == LEFT else 0)),
                      cur_y + (1 if next_direction == DOWN else (-1 if next_direction == UP else 0)))
@@ -80,7 +79,8 @@ while next_direction != buttons.BTN_B:
     # If snake bites itself, the game's over
     if snake[0] in snake[1:]:
         print('dead')
-        break
+        runtime.stop()
+        return
 
     if snake[0] == food:
         # Snake eats the food
@@ -95,11 +95,19 @@ while next_direction != buttons.BTN_B:
         # Remove last entry from tail (snake didn't grow)
         last = snake.pop()
 
-    bA()
-    # Sleeping 10 times instead of 1 large chunk, for better button responsiveness
-    [sleep(0.01) for i in range(0,10)]
     cur_direction = next_direction
 
+
+runtime = Runtime()
+runtime.on_button(UP, input_up)
+runtime.on_button(DOWN, input_down)
+runtime.on_button(LEFT, input_left)
+runtime.on_button(RIGHT, input_right)
+runtime.on_button(buttons.BTN_B, input_B)
+runtime.every(1000 // FPS, step)
+runtime.render(FPS, bA)
+runtime.run()
+
 rgb.clear()
 uinterface.skippabletext("Score - " + str(score))
-system.reboot()
\ No newline at end of file
+system.reboot()
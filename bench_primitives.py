@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark of the drawing primitives, pure Python against the ones in use
+
+On the badge (after upload-lib.sh): python3 -m mpremote run bench_primitives.py
+On the host (python3 bench_primitives.py) the selected ones are the pure
+Python ones, so the speedup is 1.
+"""
+from array import array
+
+try:
+    from time import ticks_us, ticks_diff
+except ImportError:
+    from time import perf_counter
+
+    def ticks_us():
+        return int(perf_counter() * 1000000)
+
+    def ticks_diff(new, old):
+        return new - old
+
+try:
+    from badgelib import purepy, primitives
+except ImportError:
+    # On the host, badgelib is in lib next to this script
+    import os
+    import sys
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lib'))
+    from badgelib import purepy, primitives
+
+ROUNDS = 20
+SIZE = 32 * 19
+
+buf = array('I', [0] * SIZE)
+lo = bytearray([32] * 19)
+hi = bytearray(19)
+pixels = bytearray(i % 7 for i in range(SIZE))
+table = bytearray(i - 1 if i % 7 else i for i in range(256))
+lut = array('I', [i * 0x01010100 for i in range(256)])
+# A 29x5 block of 1 pixel runs with gaps, like the message sprites
+runs = bytes(v for y in range(5) for x in range(0, 29, 2) for v in (y, x, 1))
+at = array('i', [1, 7])
+
+
+def cases(m):
+    m.bind(buf, lo, hi)
+    return [
+        ('set_pixel x608', lambda: [m.set_pixel(i & 31, i >> 5, 0x11223300) for i in range(SIZE)]),
+        ('fill_words', lambda: m.fill_words(buf, 0, SIZE, 0x11223300)),
+        ('fill_column x32', lambda: [m.fill_column(x, 0, 19, 0x11223300) for x in range(32)]),
+        ('blit_runs', lambda: m.blit_runs(buf, runs, at, 0x11223300)),
+        ('translate (fade)', lambda: m.translate(pixels, table)),
+        ('lut_convert', lambda: m.lut_convert(buf, pixels, lut)),
+        ('fade_convert', lambda: m.fade_convert(pixels, table, lut, buf)),
+        ('pack_rgb x100', lambda: [m.pack_rgb(200, i, 100) for i in range(100)]),
+    ]
+
+
+def time_us(fn):
+    best = None
+    for _ in range(ROUNDS):
+        start = ticks_us()
+        fn()
+        t = ticks_diff(ticks_us(), start)
+        if best is None or t < best:
+            best = t
+    return best
+
+
+print('native primitives:', primitives.NATIVE)
+print('%-18s %10s %10s %8s' % ('primitive', 'python us', 'in use us', 'speedup'))
+for (name, slow), (_, fast) in zip(cases(purepy), cases(primitives)):
+    t_slow = time_us(slow)
+    t_fast = time_us(fast)
+    print('%-18s %10d %10d %7.1fx' % (name, t_slow, t_fast, t_slow / max(t_fast, 1)))
@@ -0,0 +1,4 @@
+# Headless badge emulator for running apps on a desktop Python with numpy
+from .clock import VirtualClock
+from .hardware import Display, Buttons, Accel, EmulatorExit, WIDTH, HEIGHT, BUTTON_NAMES
+from .badge import Emulator, RunResult
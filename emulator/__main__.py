@@ -0,0 +1,39 @@
+# python3 -m emulator <app> [--seconds N] [--press MS:BUTTON] [--tilt MS:X,Y,Z] [--record FILE | --replay FILE]
+import argparse
+
+from .badge import Emulator
+
+
+def timed(value):
+    t_ms, _, rest = value.partition(':')
+    return int(t_ms), rest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a badge app headless")
+    parser.add_argument('app', help="package name under apps/ or apps_todo/")
+    parser.add_argument('--seconds', type=float, default=30, help="badge time to run for")
+    parser.add_argument('--max-sleeps', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--press', type=timed, action='append', default=[], metavar='MS:BUTTON',
+                        help="tap a button (UP, DOWN, LEFT, RIGHT, A, B) at MS")
+    parser.add_argument('--tilt', type=timed, action='append', default=[], metavar='MS:X,Y,Z',
+                        help="accelerometer reading from MS on")
+    parser.add_argument('--record', metavar='FILE', help="log the app's input and random seed to FILE")
+    parser.add_argument('--replay', metavar='FILE', help="feed the input recorded in FILE to the app")
+    parser.add_argument('--quiet', action='store_true', help="don't print the final frame")
+    args = parser.parse_args()
+
+    emulator = Emulator(seed=args.seed, record=args.record, replay=args.replay)
+    for t_ms, button in args.press:
+        emulator.tap(t_ms, button)
+    for t_ms, xyz in args.tilt:
+        emulator.tilt(t_ms, [int(v) for v in xyz.split(',')])
+    result = emulator.run(args.app, seconds=args.seconds, max_sleeps=args.max_sleeps)
+    print(result)
+    if not args.quiet:
+        print(emulator.rgb.to_ascii())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+# asyncio on the virtual clock
+# The event loop reads the emulator's clock and its selector, instead of
+# blocking, moves the clock to the next timer or to the next scripted input,
+# whichever comes first. Only timers and the emulated IRQs wake it up, there
+# are no real file descriptors on the badge.
+import asyncio
+import math
+import selectors
+
+# A wait without timeout still moves the clock in bounded steps
+IDLE_STEP_US = 3600 * 1000000
+
+
+class VirtualSelector(selectors.SelectSelector):
+    def __init__(self, clock):
+        super().__init__()
+        self.clock = clock
+
+    def select(self, timeout=None):
+        if timeout is None:
+            self.clock.advance_us(IDLE_STEP_US, wake=True)
+        elif timeout > 0:
+            # Round float noise away but always move, or the loop spins
+            self.clock.advance_us(max(1, math.ceil(timeout * 1000000 - 0.001)), wake=True)
+        return []
+
+
+class VirtualEventLoop(asyncio.SelectorEventLoop):
+    def __init__(self, clock):
+        super().__init__(VirtualSelector(clock))
+        self.clock = clock
+
+    def time(self):
+        return self.clock.now_us / 1000000
+
+
+class VirtualEventLoopPolicy(asyncio.DefaultEventLoopPolicy):
+    def __init__(self, clock):
+        super().__init__()
+        self.clock = clock
+
+    def new_event_loop(self):
+        return VirtualEventLoop(self.clock)
@@ -0,0 +1,191 @@
+# Runs a badge app in this interpreter against the emulated hardware
+import asyncio
+import importlib
+import os
+import random
+import sys
+import time as _time
+
+from .aio import VirtualEventLoopPolicy
+from .clock import VirtualClock
+from .hardware import (Display, Buttons, Accel, Nvs, System, UInterface, Battery, EmulatorExit,
+                       BUTTON_NAMES)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATHS = [os.path.join(ROOT, d) for d in ('lib', 'apps', 'apps_todo')]
+HARDWARE_MODULES = ('time', 'rgb', 'buttons', 'accel', 'nvs', 'system', 'uinterface', 'battery')
+
+
+def button_index(button):
+    if isinstance(button, str):
+        return BUTTON_NAMES.index(button.upper())
+    return button
+
+
+class RunResult:
+    def __init__(self, app, reason, emulator, wall_s):
+        self.app = app
+        self.reason = reason
+        self.virtual_ms = emulator.clock.now_ms
+        self.sleeps = emulator.clock.sleeps
+        self.image_calls = emulator.rgb.image_calls
+        self.pixels_pushed = emulator.rgb.pixels_pushed
+        self.button_presses = emulator.buttons.presses
+        self.accel_reads = emulator.accel.reads
+        self.wall_s = wall_s
+
+    def __repr__(self):
+        return '%s: %s after %d ms badge time, %d sleeps, %d rgb.image calls, %d pixels, %.2f s wall' % (
+            self.app, self.reason, self.virtual_ms, self.sleeps, self.image_calls,
+            self.pixels_pushed, self.wall_s)
+
+
+class Emulator:
+    """A fresh badge: one clock, display and set of peripherals per instance.
+
+    Input is scripted ahead of run() and delivered when the app's sleeps move
+    the clock past it, like IRQs firing between frames on the badge. Apps
+    waiting in asyncio wake up right at the event instead.
+
+    With record or replay set to a path, the app's input is logged to it, or
+    taken from it instead of the script, by a badgelib.replay session.
+    """
+
+    def __init__(self, seed=0, nickname='badge', battery=80, record=None, replay=None):
+        self.seed = seed
+        self.record = record
+        self.replay = replay
+        self.clock = VirtualClock()
+        self.rgb = Display(self.clock)
+        self.buttons = Buttons()
+        self.accel = Accel(self.clock)
+        self.nvs = Nvs({('system', 'nickname'): nickname})
+        self.system = System()
+        self.uinterface = UInterface()
+        self.battery = Battery(battery)
+        # (t_us, order, action), sorted on delivery
+        self.events = []
+        # (badge time, display updates so far) of every button press, for latency
+        self.press_times = []
+        self.deadline_us = None
+        self.clock.listeners.append(self._deliver)
+
+    # --- scripted input ---
+    def at(self, t_ms, action):
+        """Call action() once the clock reaches t_ms."""
+        self.events.append((int(t_ms * 1000), len(self.events), action))
+        self.events.sort()
+
+    def press(self, t_ms, button):
+        index = button_index(button)
+
+        def apply():
+            self.press_times.append((self.clock.now_us, len(self.rgb.updates)))
+            self.buttons.set(index, True)
+        self.at(t_ms, apply)
+
+    def release(self, t_ms, button):
+        index = button_index(button)
+        self.at(t_ms, lambda: self.buttons.set(index, False))
+
+    def tap(self, t_ms, button, hold_ms=50):
+        self.press(t_ms, button)
+        self.release(t_ms + hold_ms, button)
+
+    def tilt(self, t_ms, xyz):
+        """Accelerometer reads xyz from t_ms on."""
+        def apply():
+            self.accel.source = None
+            self.accel.xyz = tuple(xyz)
+        self.at(t_ms, apply)
+
+    def accel_source(self, source):
+        """Accelerometer reads source(t_ms) instead of scripted values."""
+        self.accel.source = source
+
+    def _deliver(self, target_us):
+        clock = self.clock
+        while self.events and self.events[0][0] <= target_us:
+            t_us, _, action = self.events.pop(0)
+            if t_us > clock.now_us:
+                clock.now_us = t_us
+            action()
+            clock.woken = True
+            # Events at the same time go together, the waiting loop runs next
+            if clock.wake and not (self.events and self.events[0][0] <= clock.now_us):
+                return
+        if self.deadline_us is not None and target_us >= self.deadline_us:
+            clock.now_us = self.deadline_us
+            # Only once, the app's event loop still runs its cleanup
+            self.deadline_us = None
+            raise EmulatorExit('timeout')
+
+    # --- running ---
+    def modules(self):
+        return {
+            'time': self.clock.module(),
+            'rgb': self.rgb.module(),
+            'buttons': self.buttons.module(),
+            'accel': self.accel.module(),
+            'nvs': self.nvs.module(),
+            'system': self.system.module(),
+            'uinterface': self.uinterface.module(),
+            'battery': self.battery.module(),
+        }
+
+    @staticmethod
+    def _is_app_module(name, app):
+        root = name.split('.')[0]
+        return root == app or root == 'badgelib'
+
+    def run(self, app, seconds=60, max_sleeps=None):
+        """Import app (its package runs main() on import) until it exits or time is up."""
+        self.deadline_us = None if seconds is None else self.clock.now_us + int(seconds * 1000000)
+        if max_sleeps is not None:
+            limit = self.clock.sleeps + max_sleeps
+
+            def stop_after(target_us):
+                if self.clock.sleeps == limit:
+                    raise EmulatorExit('max sleeps')
+            self.clock.listeners.append(stop_after)
+
+        saved_modules = {name: sys.modules.get(name) for name in HARDWARE_MODULES}
+        saved_path = list(sys.path)
+        saved_random = random.getstate()
+        saved_policy = asyncio.get_event_loop_policy()
+        asyncio.set_event_loop_policy(VirtualEventLoopPolicy(self.clock))
+        for name in [n for n in sys.modules if self._is_app_module(n, app)]:
+            del sys.modules[name]
+        sys.modules.update(self.modules())
+        sys.path[:0] = APP_PATHS
+        random.seed(self.seed)
+        reason = 'returned'
+        start = _time.perf_counter()
+        session = None
+        try:
+            if self.record or self.replay:
+                session = importlib.import_module('badgelib.replay')
+                if self.record:
+                    session.record(self.record)
+                else:
+                    session.replay(self.replay)
+            __import__(app)
+        except EmulatorExit as e:
+            reason = e.reason
+        finally:
+            wall = _time.perf_counter() - start
+            if session is not None:
+                session.stop()
+            for name in [n for n in sys.modules if self._is_app_module(n, app)]:
+                del sys.modules[name]
+            for name, module in saved_modules.items():
+                if module is None:
+                    sys.modules.pop(name, None)
+                else:
+                    sys.modules[name] = module
+            sys.path[:] = saved_path
+            random.setstate(saved_random)
+            asyncio.set_event_loop_policy(saved_policy)
+            if max_sleeps is not None:
+                self.clock.listeners.remove(stop_after)
+        return RunResult(app, reason, self, wall)
@@ -0,0 +1,340 @@
+# Per app benchmarks on the emulator
+# python3 -m emulator.bench [--out DIR] [--baseline DIR] [--replay APP:FILE] [app ...]
+#
+# Every scenario (an app in one phase, like the kolab game or its win
+# animation) is run three times with the same seed and input: once for CPU
+# time, once counting Python calls and once under tracemalloc, so the
+# instrumentation of one metric does not skew the others. A frame ends at the
+# first sleep or event loop wait after the app drew something, so wakeups
+# for input or sensors in between count towards the frame they precede.
+# Input latency is the badge time from a button press to the next LED change.
+# --replay adds a scenario running a session recorded with badgelib.replay
+# (or python3 -m emulator APP --record FILE) from start to end.
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import math
+import os
+import sys
+import time
+import tracemalloc
+
+from .badge import Emulator, ROOT
+from .hardware import EmulatorExit
+
+EMULATOR_DIR = os.path.dirname(os.path.abspath(__file__))
+# CPython's asyncio is all Python, far more calls than uasyncio's scheduler
+ASYNCIO_DIR = os.path.dirname(os.path.abspath(asyncio.__file__))
+
+
+def swaying(period_ms, amplitude):
+    """Accelerometer source tilting the badge back and forth on both axes."""
+    def source(t_ms):
+        phase = 2 * math.pi * t_ms / period_ms
+        return (int(amplitude * math.sin(phase)), int(amplitude * math.cos(phase)), 0)
+    return source
+
+
+def kolab_game(emulator):
+    emulator.accel_source(swaying(6000, 20000))
+    # BTN_A restarts the game while IS_DEBUG is set
+    emulator.tap(10037, 'A')
+
+
+def kolab_matrix(emulator):
+    # BTN_RIGHT forces a win while IS_DEBUG is set
+    emulator.tap(500, 'RIGHT')
+
+
+def northstar_idle(emulator):
+    # Starts the game during the last measured color, for the latency of leaving idle
+    emulator.tap(95337, 'RIGHT')
+
+
+def northstar_flappy(emulator):
+    emulator.tap(500, 'RIGHT')
+    for t_ms in range(1000, 120000, 450):
+        emulator.tap(t_ms, 'UP')
+
+
+def snake(emulator):
+    # Square loop through the middle of the screen so the snake never dies
+    t_ms = 537
+    while t_ms < 120000:
+        for button in ('DOWN', 'LEFT', 'UP', 'RIGHT'):
+            emulator.tap(t_ms, button)
+            t_ms += 800
+
+
+def replaying(path):
+    def setup(emulator):
+        emulator.replay = path
+    return setup
+
+
+# (app, phase, setup, warmup in ms of badge time, frames to measure)
+SCENARIOS = [
+    ('kolab_game', 'game', kolab_game, 1000, 200),
+    ('kolab_game', 'matrix', kolab_matrix, 1500, 200),
+    ('n1ckname', 'matrix', None, 500, 200),
+    # A frame of the idle star is one color, the gif animates in between
+    ('northstar_agy', 'idle', northstar_idle, 500, 20),
+    ('northstar_agy', 'flappy', northstar_flappy, 1000, 200),
+    ('twinkle_fox', 'twinkle', None, 500, 300),
+    ('snake_v0', 'snake', snake, 500, 200),
+]
+# Frames to measure of a replayed session, it usually ends well before
+REPLAY_FRAMES = 100000
+
+METRICS = ('cpu_us_per_frame', 'calls_per_frame', 'alloc_bytes_per_frame', 'image_calls_per_frame',
+           'pixels_per_frame', 'input_latency_ms')
+
+
+class FrameWindow:
+    """Clock listener marking frame boundaries inside the measured window."""
+
+    def __init__(self, emulator, warmup_ms, frames, on_start=None, on_frame=None):
+        self.emulator = emulator
+        self.warmup_us = warmup_ms * 1000
+        self.frames = frames
+        self.on_start = on_start
+        self.on_frame = on_frame
+        self.count = -1
+        emulator.clock.listeners.append(self)
+
+    def _drawn(self):
+        framebuffer = sys.modules.get('badgelib.framebuffer')
+        return len(self.emulator.rgb.updates) + (framebuffer.flush_count if framebuffer else 0)
+
+    def __call__(self, target_us):
+        if self.count >= self.frames:
+            # Done, the app is shutting down
+            return
+        emulator = self.emulator
+        if self.count < 0:
+            if emulator.clock.now_us < self.warmup_us:
+                return
+            self.start_us = emulator.clock.now_us
+            self.wakeups = emulator.clock.sleeps
+            self.image_calls = emulator.rgb.image_calls
+            self.pixels = emulator.rgb.pixels_pushed
+            self.drawn = self._drawn()
+            if self.on_start:
+                self.on_start()
+            self.count = 0
+            return
+        drawn = self._drawn()
+        if drawn == self.drawn:
+            return
+        self.drawn = drawn
+        if self.on_frame:
+            self.on_frame()
+        self.count += 1
+        if self.count == self.frames:
+            self.end_us = emulator.clock.now_us
+            self.wakeups = emulator.clock.sleeps - self.wakeups
+            self.image_calls = emulator.rgb.image_calls - self.image_calls
+            self.pixels = emulator.rgb.pixels_pushed - self.pixels
+            raise EmulatorExit('done')
+
+    def input_latencies(self):
+        """Badge time in us from each press in the window to the next LED change."""
+        end_us = getattr(self, 'end_us', self.emulator.clock.now_us)
+        updates = self.emulator.rgb.updates
+        latencies = []
+        for t_us, index in self.emulator.press_times:
+            if self.count >= 0 and self.start_us <= t_us < end_us and index < len(updates):
+                latencies.append(updates[index] - t_us)
+        return latencies
+
+
+def run_scenario(app, setup, warmup_ms, frames, seed, instrument=None):
+    emulator = Emulator(seed=seed)
+    if setup:
+        setup(emulator)
+    window = FrameWindow(emulator, warmup_ms, frames, *(instrument or ()))
+    # Leave time for the warmup and a slow app, the window ends the run
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = emulator.run(app, seconds=warmup_ms / 1000 + frames * 10)
+    return window, result
+
+
+def measure_cpu(app, setup, warmup_ms, frames, seed):
+    times = []
+
+    def frame():
+        now = time.process_time_ns()
+        times.append(now - state[0])
+        state[0] = now
+
+    state = [0]
+
+    def start():
+        state[0] = time.process_time_ns()
+
+    window, result = run_scenario(app, setup, warmup_ms, frames, seed, (start, frame))
+    times.sort()
+    return window, result, {
+        'cpu_us_per_frame': sum(times) / len(times) / 1000 if times else 0,
+        'cpu_us_p95': times[len(times) * 95 // 100] / 1000 if times else 0,
+        'cpu_us_max': times[-1] / 1000 if times else 0,
+    }
+
+
+def measure_calls(app, setup, warmup_ms, frames, seed):
+    counts = {'python': 0, 'builtin': 0, 'scheduler': 0}
+    active = [False]
+
+    def profile(frame, event, arg):
+        if not active[0]:
+            return
+        if event == 'call':
+            filename = frame.f_code.co_filename
+            # The emulator's own hardware code is not the app's cost
+            if filename.startswith(ASYNCIO_DIR):
+                counts['scheduler'] += 1
+            elif not filename.startswith(EMULATOR_DIR):
+                counts['python'] += 1
+        elif event == 'c_call':
+            counts['builtin'] += 1
+
+    def start():
+        active[0] = True
+
+    sys.setprofile(profile)
+    try:
+        window, result = run_scenario(app, setup, warmup_ms, frames, seed, (start, None))
+    finally:
+        sys.setprofile(None)
+    measured = max(window.count, 1)
+    return {
+        'calls_per_frame': counts['python'] / measured,
+        'builtin_calls_per_frame': counts['builtin'] / measured,
+        'scheduler_calls_per_frame': counts['scheduler'] / measured,
+    }
+
+
+def measure_allocations(app, setup, warmup_ms, frames, seed):
+    peaks = []
+    state = [0, 0]
+
+    def start():
+        tracemalloc.reset_peak()
+        state[0] = state[1] = tracemalloc.get_traced_memory()[0]
+
+    def frame():
+        current, peak = tracemalloc.get_traced_memory()
+        # Bytes allocated on top of what was live when the frame started
+        peaks.append(peak - state[0])
+        tracemalloc.reset_peak()
+        state[0] = current
+
+    tracemalloc.start()
+    try:
+        window, result = run_scenario(app, setup, warmup_ms, frames, seed, (start, frame))
+        retained = tracemalloc.get_traced_memory()[0] - state[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        'alloc_bytes_per_frame': sum(peaks) / len(peaks) if peaks else 0,
+        'alloc_bytes_max': max(peaks) if peaks else 0,
+        'retained_bytes': retained,
+    }
+
+
+def benchmark(app, phase, setup, warmup_ms, frames, seed=0):
+    window, result, stats = measure_cpu(app, setup, warmup_ms, frames, seed)
+    measured = max(window.count, 0)
+    latencies = window.input_latencies()
+    stats.update(measure_calls(app, setup, warmup_ms, frames, seed))
+    stats.update(measure_allocations(app, setup, warmup_ms, frames, seed))
+    stats.update({
+        'frames': measured,
+        'exit': result.reason,
+        'image_calls_per_frame': window.image_calls / measured if measured else 0,
+        'pixels_per_frame': window.pixels / measured if measured else 0,
+        'wakeups_per_frame': window.wakeups / measured if measured and result.reason == 'done' else 0,
+        'input_latency_ms': sum(latencies) / len(latencies) / 1000 if latencies else 0,
+        'input_latency_max_ms': max(latencies) / 1000 if latencies else 0,
+    })
+    return stats
+
+
+def compare(app, phases, baseline_dir, tolerance):
+    """Print the change against a baseline, returns the metrics over tolerance."""
+    path = os.path.join(baseline_dir, app + '.json')
+    if not os.path.exists(path):
+        print('  no baseline for %s' % app)
+        return []
+    with open(path) as f:
+        baseline = json.load(f)['phases']
+    regressions = []
+    for phase, stats in phases.items():
+        if phase not in baseline:
+            continue
+        for metric in METRICS:
+            old = baseline[phase].get(metric)
+            new = stats[metric]
+            if not old:
+                continue
+            change = (new - old) / old
+            print('  %-8s %-22s %12.1f -> %12.1f  %+6.1f%%' % (phase, metric, old, new, change * 100))
+            # CPU time depends on the host, only the deterministic counts gate
+            if metric != 'cpu_us_per_frame' and change > tolerance:
+                regressions.append('%s/%s %s' % (app, phase, metric))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the apps on the emulator")
+    parser.add_argument('apps', nargs='*', help="apps to run, all when empty")
+    parser.add_argument('--out', default=os.path.join(ROOT, 'bench-results'),
+                        help="directory for the <app>.json results")
+    parser.add_argument('--baseline', help="directory with earlier results to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.05,
+                        help="allowed growth of calls, allocations and pixels against the baseline")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--replay', action='append', default=[], metavar='APP:FILE',
+                        help="also measure the session of APP recorded in FILE, as phase 'replay'")
+    args = parser.parse_args()
+
+    scenarios = list(SCENARIOS)
+    for value in args.replay:
+        app, _, path = value.partition(':')
+        scenarios.append((app, 'replay', replaying(path), 0, REPLAY_FRAMES))
+    results = {}
+    for app, phase, setup, warmup_ms, frames in scenarios:
+        if args.apps and app not in args.apps:
+            continue
+        stats = benchmark(app, phase, setup, warmup_ms, frames, args.seed)
+        results.setdefault(app, {})[phase] = stats
+        print('%-14s %-8s %4d frames  %8.1f us cpu  %7.1f calls  %8.1f B alloc  %5.1f images  '
+              '%6.1f ms input  (%s)' % (
+                  app, phase, stats['frames'], stats['cpu_us_per_frame'], stats['calls_per_frame'],
+                  stats['alloc_bytes_per_frame'], stats['image_calls_per_frame'],
+                  stats['input_latency_ms'], stats['exit']))
+
+    regressions = []
+    if args.baseline:
+        # Before writing, the baseline may be the output directory
+        for app, phases in results.items():
+            print(app)
+            regressions += compare(app, phases, args.baseline, args.tolerance)
+    os.makedirs(args.out, exist_ok=True)
+    for app, phases in results.items():
+        for stats in phases.values():
+            for key, value in stats.items():
+                if isinstance(value, float):
+                    stats[key] = round(value, 2)
+        with open(os.path.join(args.out, app + '.json'), 'w') as f:
+            json.dump({'app': app, 'seed': args.seed, 'python': sys.version.split()[0],
+                       'phases': phases}, f, indent=2, sort_keys=True)
+    if regressions:
+        print('over budget: ' + ', '.join(regressions))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# Virtual clock for the emulator
+# Time only moves when the app sleeps, so a run of minutes of badge time takes
+# as long as the app's Python code needs, not as long as its sleeps.
+import time as _time
+import types
+
+TICKS_PERIOD = 1 << 30
+_TICKS_MAX = TICKS_PERIOD - 1
+_TICKS_HALF = TICKS_PERIOD // 2
+
+
+class VirtualClock:
+    def __init__(self, epoch=1725000000):
+        self.now_us = 0
+        self.epoch = epoch
+        self.sleeps = 0
+        # Called with the new time in us for every step the clock takes
+        self.listeners = []
+        # Set by a listener that delivered input during the current step
+        self.woken = False
+        self.wake = False
+
+    def advance_us(self, us, wake=False):
+        """Move the clock forward by us.
+
+        With wake the step ends early at the first input a listener delivers,
+        like an event loop waiting for an IRQ. Returns True when it did.
+        """
+        if us < 0:
+            raise ValueError("sleep length must be non-negative")
+        self.sleeps += 1
+        target = self.now_us + int(us)
+        self.woken = False
+        self.wake = wake
+        for listener in self.listeners:
+            # Listeners may move now_us forward to deliver events in between
+            listener(target)
+        if wake and self.woken:
+            return True
+        self.now_us = target
+        return False
+
+    @property
+    def now_ms(self):
+        return self.now_us // 1000
+
+    # --- MicroPython time API ---
+    def sleep(self, seconds):
+        self.advance_us(seconds * 1000000)
+
+    def sleep_ms(self, ms):
+        self.advance_us(ms * 1000)
+
+    def sleep_us(self, us):
+        self.advance_us(us)
+
+    def ticks_ms(self):
+        return (self.now_us // 1000) & _TICKS_MAX
+
+    def ticks_us(self):
+        return self.now_us & _TICKS_MAX
+
+    def ticks_cpu(self):
+        return self.ticks_us()
+
+    @staticmethod
+    def ticks_diff(new, old):
+        return ((new - old + _TICKS_HALF) & _TICKS_MAX) - _TICKS_HALF
+
+    @staticmethod
+    def ticks_add(ticks, delta):
+        return (ticks + delta) & _TICKS_MAX
+
+    def time(self):
+        return self.epoch + self.now_us / 1000000
+
+    def time_ns(self):
+        return self.epoch * 1000000000 + self.now_us * 1000
+
+    def module(self):
+        """A stand-in for the time module, real functions with the clock ones on top."""
+        mod = types.ModuleType('time')
+        for name in dir(_time):
+            if not name.startswith('__'):
+                setattr(mod, name, getattr(_time, name))
+        for name in ('sleep', 'sleep_ms', 'sleep_us', 'ticks_ms', 'ticks_us', 'ticks_cpu',
+                     'ticks_diff', 'ticks_add', 'time', 'time_ns'):
+            setattr(mod, name, getattr(self, name))
+        return mod
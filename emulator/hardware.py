@@ -0,0 +1,305 @@
+# Host side stand-ins for the badge firmware modules
+# Every class exposes the firmware module API as methods, Emulator turns an
+# instance into a module object and puts it in sys.modules.
+import types
+
+import numpy as np
+
+WIDTH, HEIGHT = 32, 19
+
+BTN_UP, BTN_DOWN, BTN_LEFT, BTN_RIGHT, BTN_A, BTN_B = range(6)
+BUTTON_NAMES = ('UP', 'DOWN', 'LEFT', 'RIGHT', 'A', 'B')
+
+
+class EmulatorExit(BaseException):
+    """Raised into the app to end a run, BaseException so apps can't swallow it."""
+
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason
+
+
+def as_module(name, obj, names, constants=None):
+    mod = types.ModuleType(name)
+    for attr in names:
+        setattr(mod, attr, getattr(obj, attr))
+    for attr, value in (constants or {}).items():
+        setattr(mod, attr, value)
+    return mod
+
+
+def pack_color(color):
+    """(r, g, b) or (r, g, b, a) to 0xRRGGBBAA, like the firmware."""
+    if len(color) == 3:
+        r, g, b = color
+        a = 0xff
+    else:
+        r, g, b, a = color
+    return (r << 24) | (g << 16) | (b << 8) | a
+
+
+class Display:
+    """rgb module, a 32x19 surface of packed 0xRRGGBBAA pixels."""
+    API = ('image', 'gif', 'clear', 'background', 'pixel', 'text', 'scrolltext', 'framerate',
+           'setbrightness', 'getbrightness', 'setfont')
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.surface = np.zeros((HEIGHT, WIDTH), dtype=np.uint32)
+        self.brightness = 100
+        self.fps = 20
+        self.animation = None
+        self.texts = []
+        self.image_calls = 0
+        self.gif_calls = 0
+        self.pixels_pushed = 0
+        # Badge time of every call that changed the LEDs
+        self.updates = []
+
+    def module(self):
+        return as_module('rgb', self, self.API, {'screenwidth': WIDTH, 'screenheight': HEIGHT})
+
+    def _blit(self, pixels, x, y):
+        h, w = pixels.shape
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, WIDTH), min(y + h, HEIGHT)
+        if x0 < x1 and y0 < y1:
+            self.surface[y0:y1, x0:x1] = pixels[y0 - y:y1 - y, x0 - x:x1 - x]
+
+    def image(self, data, pos=(0, 0), size=(8, 8)):
+        w, h = size
+        pixels = np.asarray(data, dtype=np.uint32)
+        if pixels.size != w * h:
+            raise ValueError("image data has %d pixels, size is %dx%d" % (pixels.size, w, h))
+        self._blit(pixels.reshape(h, w), pos[0], pos[1])
+        self.updates.append(self.clock.now_us)
+        self.image_calls += 1
+        self.pixels_pushed += w * h
+
+    def gif(self, data, pos=(0, 0), size=(8, 8), frames=1):
+        w, h = size
+        pixels = np.array(data, dtype=np.uint32)
+        if pixels.size != w * h * frames:
+            raise ValueError("gif data has %d pixels, expected %d frames of %dx%d" % (pixels.size, frames, w, h))
+        self.animation = (pixels.reshape(frames, h, w), pos, self.clock.now_us)
+        self.updates.append(self.clock.now_us)
+        self.gif_calls += 1
+        self.pixels_pushed += w * h * frames
+
+    def clear(self):
+        self.surface[:] = 0
+        self.animation = None
+        self.updates.append(self.clock.now_us)
+
+    def background(self, color=(0, 0, 0)):
+        self.surface[:] = pack_color(color)
+        self.animation = None
+        self.updates.append(self.clock.now_us)
+
+    def pixel(self, color=(255, 255, 255), pos=(0, 0)):
+        x, y = pos
+        if 0 <= x < WIDTH and 0 <= y < HEIGHT:
+            self.surface[y, x] = pack_color(color)
+            self.updates.append(self.clock.now_us)
+            self.pixels_pushed += 1
+
+    def text(self, text, color=(255, 255, 255), pos=None):
+        # No font rendering, the text is only recorded
+        self.texts.append(text)
+
+    def scrolltext(self, text, color=(255, 255, 255), pos=None, width=None):
+        self.texts.append(text)
+
+    def framerate(self, fps):
+        self.fps = fps
+
+    def setbrightness(self, brightness):
+        self.brightness = brightness
+
+    def getbrightness(self):
+        return self.brightness
+
+    def setfont(self, font_index):
+        pass
+
+    def snapshot(self):
+        """The surface as shown now, with the running gif frame on top."""
+        surface = self.surface.copy()
+        if self.animation is not None:
+            frames, (x, y), start = self.animation
+            index = (self.clock.now_us - start) * self.fps // 1000000 % len(frames)
+            h, w = frames[index].shape
+            x0, y0 = max(x, 0), max(y, 0)
+            x1, y1 = min(x + w, WIDTH), min(y + h, HEIGHT)
+            surface[y0:y1, x0:x1] = frames[index][y0 - y:y1 - y, x0 - x:x1 - x]
+        return surface
+
+    def to_rgb(self):
+        """(HEIGHT, WIDTH, 3) uint8 array, alpha is ignored."""
+        surface = self.snapshot()
+        return np.stack([(surface >> 24) & 0xff, (surface >> 16) & 0xff, (surface >> 8) & 0xff],
+                        axis=-1).astype(np.uint8)
+
+    def to_ascii(self):
+        rgb = self.to_rgb().max(axis=-1).astype(int)
+        shades = ' .:-=+*#%@'
+        return '\n'.join(''.join(shades[v * (len(shades) - 1) // 255] for v in row) for row in rgb)
+
+
+class Buttons:
+    """buttons module, with a stack of callback mappings like the firmware."""
+    API = ('register', 'assign', 'attach', 'detach', 'unassign', 'value', 'getCallback',
+           'pushMapping', 'popMapping', 'init_button_mapping', 'clear_button_mapping')
+
+    def __init__(self):
+        self.mappings = [[None] * 6]
+        self.pressed = [False] * 6
+        self.presses = 0
+
+    def module(self):
+        return as_module('buttons', self, self.API, {
+            'BTN_UP': BTN_UP, 'BTN_DOWN': BTN_DOWN, 'BTN_LEFT': BTN_LEFT,
+            'BTN_RIGHT': BTN_RIGHT, 'BTN_A': BTN_A, 'BTN_B': BTN_B})
+
+    @staticmethod
+    def _check(button):
+        if button < 0 or button >= 6:
+            raise ValueError("Invalid button!")
+
+    def attach(self, button, callback):
+        self._check(button)
+        self.mappings[-1][button] = callback
+
+    def assign(self, button, action=None):
+        self.attach(button, action)
+        return True
+
+    register = assign
+
+    def detach(self, button):
+        self.attach(button, None)
+
+    def unassign(self, button):
+        return self.assign(button, None)
+
+    def value(self, button):
+        self._check(button)
+        return self.pressed[button]
+
+    def getCallback(self, button):
+        self._check(button)
+        return self.mappings[-1][button]
+
+    def pushMapping(self, newMapping=None):
+        self.mappings.append([None] * 6 if newMapping is None else
+                             [newMapping.get(button) for button in range(6)])
+
+    def popMapping(self):
+        if len(self.mappings) > 1:
+            self.mappings.pop()
+
+    def init_button_mapping(self):
+        self.pushMapping()
+        return True
+
+    def clear_button_mapping(self):
+        self.popMapping()
+        return True
+
+    def set(self, button, down):
+        """Press or release a button, calling the app's callback like the IRQ would."""
+        self.pressed[button] = down
+        if down:
+            self.presses += 1
+        callback = self.mappings[-1][button]
+        if callback:
+            callback(down)
+
+
+class Accel:
+    """accel module, the reading is set by the script or by a function of time."""
+    API = ('init', 'get_xyz')
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.xyz = (0, 0, 0)
+        self.source = None
+        self.reads = 0
+
+    def module(self):
+        return as_module('accel', self, self.API)
+
+    def init(self):
+        pass
+
+    def get_xyz(self):
+        self.reads += 1
+        if self.source is not None:
+            return self.source(self.clock.now_ms)
+        return self.xyz
+
+
+class Nvs:
+    """nvs module backed by a dict of (namespace, key) pairs."""
+    API = ('get_str', 'set_str', 'get_int', 'set_int')
+
+    def __init__(self, values=None):
+        self.values = {('system', 'nickname'): 'badge'}
+        self.values.update(values or {})
+
+    def module(self):
+        return as_module('nvs', self, self.API)
+
+    def get_str(self, namespace, key):
+        return self.values.get((namespace, key))
+
+    def set_str(self, namespace, key, value):
+        self.values[(namespace, key)] = value
+
+    get_int = get_str
+    set_int = set_str
+
+
+class System:
+    """system module, leaving the app ends the run."""
+    API = ('reboot', 'start', 'home')
+
+    def module(self):
+        return as_module('system', self, self.API)
+
+    def reboot(self):
+        raise EmulatorExit('reboot')
+
+    def start(self, app, status=False):
+        raise EmulatorExit('start ' + app)
+
+    def home(self):
+        raise EmulatorExit('home')
+
+
+class UInterface:
+    API = ('skippabletext',)
+
+    def __init__(self):
+        self.texts = []
+
+    def module(self):
+        return as_module('uinterface', self, self.API)
+
+    def skippabletext(self, text, color=(255, 255, 255)):
+        self.texts.append(text)
+
+
+class Battery:
+    API = ('read_batt_percentage',)
+
+    def __init__(self, percent=80):
+        self.percent = percent
+        self.reads = 0
+
+    def module(self):
+        return as_module('battery', self, self.API)
+
+    def read_batt_percentage(self):
+        self.reads += 1
+        return self.percent
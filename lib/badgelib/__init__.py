@@ -0,0 +1,2 @@
+# Shared helpers for the Brucon 0x10 badge apps
+# Installed to /lib/badgelib on the badge by upload-lib.sh
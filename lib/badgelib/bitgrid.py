@@ -0,0 +1,52 @@
+# One bit per screen pixel, a 32-bit int per row
+# Rows use the same layout as Sprite.rows (bit x is column x), so sprite
+# masks can be combined with a grid row by row.
+from array import array
+
+from .framebuffer import WIDTH, HEIGHT
+
+_blank = array('I', [0] * HEIGHT)
+
+
+class BitGrid:
+    def __init__(self, rows=None):
+        self.rows = array('I', rows if rows is not None else _blank)
+
+    @classmethod
+    def from_sprite(cls, sprite, x=0, y=0, invert=False):
+        """The set (or with invert, the clear) pixels of a sprite placed at (x, y)."""
+        grid = cls()
+        box = (1 << sprite.width) - 1
+        for row in range(sprite.height):
+            if 0 <= y + row < HEIGHT:
+                bits = sprite.rows[row]
+                if invert:
+                    bits = ~bits & box
+                grid.rows[y + row] = (bits << x if x >= 0 else bits >> -x) & ((1 << WIDTH) - 1)
+        return grid
+
+    def clear(self):
+        self.rows[:] = _blank
+
+    def set(self, x, y):
+        self.rows[y] |= 1 << x
+
+    def get(self, x, y):
+        return self.rows[y] >> x & 1
+
+    def covers(self, mask):
+        """True when every bit set in mask is set here too."""
+        rows = self.rows
+        for y in range(HEIGHT):
+            m = mask.rows[y]
+            if rows[y] & m != m:
+                return False
+        return True
+
+    def count(self):
+        n = 0
+        for row in self.rows:
+            while row:
+                row &= row - 1
+                n += 1
+        return n
@@ -0,0 +1,23 @@
+# Millisecond / microsecond tick helpers
+# On the badge these are the MicroPython time.ticks_* functions; on CPython
+# they fall back to perf_counter, wrapping the same way as on the badge, so
+# the shared code can run on a host too.
+try:
+    from time import ticks_ms, ticks_us, ticks_diff, ticks_add
+except ImportError:
+    from time import perf_counter_ns
+
+    _TICKS_MAX = (1 << 30) - 1
+    _TICKS_HALF = 1 << 29
+
+    def ticks_ms():
+        return (perf_counter_ns() // 1000000) & _TICKS_MAX
+
+    def ticks_us():
+        return (perf_counter_ns() // 1000) & _TICKS_MAX
+
+    def ticks_diff(new, old):
+        return ((new - old + _TICKS_HALF) & _TICKS_MAX) - _TICKS_HALF
+
+    def ticks_add(ticks, delta):
+        return (ticks + delta) & _TICKS_MAX
@@ -1,3 +1,4 @@
+# Debug logging shared by the apps
 # IS_DEBUG = False
 IS_DEBUG = True
 
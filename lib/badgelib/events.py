@@ -0,0 +1,146 @@
+# Preallocated button event queue
+# Button callbacks can run in interrupt context, where nothing may be
+# allocated and the app's state may be halfway through an update. The
+# buttons module passes every raw edge on, this is the only debounce layer:
+# push() only debounces and writes into preallocated arrays. The app runs the
+# handlers later from drain(), in order, looked up by button in a flat list.
+#
+# An edge within DEBOUNCE_MS of the last event is not dropped: its level is
+# kept, and settle() queues the level the button settled on once the window
+# is over, if it differs from the last event.
+from array import array
+
+from .clock import ticks_ms, ticks_us, ticks_diff, ticks_add
+
+try:
+    from machine import disable_irq, enable_irq
+except ImportError:
+    # No interrupts on CPython, push() runs on the event loop
+    def disable_irq():
+        return 0
+
+    def enable_irq(state):
+        pass
+
+BUTTONS = 6
+SIZE = 16
+# Edges of one button closer together than this are contact bounce
+DEBOUNCE_MS = 20
+
+
+class EventQueue:
+    def __init__(self, size=SIZE, debounce_ms=DEBOUNCE_MS):
+        self.size = size
+        self.debounce_ms = debounce_ms
+        # Ring of button, 1 for a press / 0 for a release, and ticks_us
+        self.button = bytearray(size)
+        self.down = bytearray(size)
+        self.at = array('I', [0] * size)
+        self.head = 0
+        self.tail = 0
+        # Last queued state and ticks_ms of its change, per button
+        self.state = bytearray(BUTTONS)
+        self.changed = array('I', [ticks_add(ticks_ms(), -debounce_ms)] * BUTTONS)
+        # Level of the last edge, and 1 while it waits for the window to end
+        self.level = bytearray(BUTTONS)
+        self.settling = bytearray(BUTTONS)
+        self.handlers = [None] * BUTTONS
+        self.dropped = 0
+        self.bounced = 0
+        # Event to handler latency
+        self.handled = 0
+        self.total_us = 0
+        self.worst_us = 0
+
+    def push(self, button, down):
+        """Queue a press or release, safe to call from an interrupt.
+
+        Returns True when there is something for drain(), an event or an
+        edge waiting for settle().
+        """
+        down = 1 if down else 0
+        self.level[button] = down
+        now = ticks_ms()
+        if ticks_diff(now, self.changed[button]) < self.debounce_ms:
+            self.bounced += 1
+            self.settling[button] = 1
+            return True
+        if down == self.state[button]:
+            return False
+        return self._put(button, down, now)
+
+    def settle(self):
+        """Queue the level of every button whose debounce window is over, if it changed.
+
+        Returns the ms until the next window ends, -1 when no button is settling.
+        """
+        wait = -1
+        now = ticks_ms()
+        for button in range(BUTTONS):
+            if not self.settling[button]:
+                continue
+            left = self.debounce_ms - ticks_diff(now, self.changed[button])
+            if left > 0:
+                if wait < 0 or left < wait:
+                    wait = left
+                continue
+            # push() may run in between, it writes the same ring
+            irq = disable_irq()
+            self.settling[button] = 0
+            down = self.level[button]
+            if down != self.state[button]:
+                self._put(button, down, now)
+            enable_irq(irq)
+        return wait
+
+    def inject(self, button, down):
+        """Queue an event as is, without debouncing, for replayed input."""
+        return self._put(button, 1 if down else 0, ticks_ms())
+
+    def _put(self, button, down, now):
+        tail = self.tail
+        following = (tail + 1) % self.size
+        if following == self.head:
+            self.dropped += 1
+            return False
+        self.state[button] = down
+        self.changed[button] = now
+        self.button[tail] = button
+        self.down[tail] = down
+        self.at[tail] = ticks_us()
+        # Publish last, drain() never sees a half written event
+        self.tail = following
+        return True
+
+    def pending(self):
+        return self.head != self.tail
+
+    def drain(self):
+        """Run the handler of every queued event in order.
+
+        Returns the ticks_us of the first press, -1 when there was none.
+        """
+        first = -1
+        while self.head != self.tail:
+            i = self.head
+            down = self.down[i] == 1
+            at = self.at[i]
+            handler = self.handlers[self.button[i]]
+            # Consumed before the handler runs, one that raises is not run again
+            self.head = (i + 1) % self.size
+            if down and first < 0:
+                first = at
+            try:
+                if handler is not None:
+                    handler(down)
+            finally:
+                latency = ticks_diff(ticks_us(), at)
+                self.handled += 1
+                self.total_us += latency
+                if latency > self.worst_us:
+                    self.worst_us = latency
+        return first
+
+    def stats(self):
+        return 'events: %d handled, avg %d us worst %d us to the handler, %d bounced %d dropped' % (
+            self.handled, self.total_us // (self.handled or 1), self.worst_us, self.bounced, self.dropped)
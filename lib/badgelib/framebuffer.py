@@ -0,0 +1,307 @@
+# Shared framebuffer for the 32x19 LED matrix
+# The buffer is allocated once at import and every draw call writes packed
+# 0xRRGGBBAA ints into it, so apps should pack their colors once up front.
+#
+# Setters record a dirty column span per row, render_image_buffer() then only
+# pushes the rows/columns that were touched since the previous flush. A copy of
+# the last pushed frame is kept so frames identical to it are not sent at all.
+# The inner loops come from primitives, viper code on the badge.
+from array import array
+
+import rgb
+from . import primitives
+from .clock import ticks_us, ticks_diff
+from .primitives import fill_words, fill_column, blit_runs, pack_rgb, pack_rgba
+
+WIDTH, HEIGHT = 32, 19
+SIZE = WIDTH * HEIGHT
+# Overhead of one extra rgb.image call, in pixels, when deciding to merge boxes
+BOX_COST = 16
+
+image_buffer = array('I', [0] * SIZE)
+_blank = array('I', [0] * SIZE)
+_scratch = array('I', [0] * SIZE)
+_shown = array('I', [0] * SIZE)
+_shown_valid = False
+_buffer_view = memoryview(image_buffer)
+_scratch_view = memoryview(_scratch)
+
+# Span per row drawn since the last flush: columns [_lo[y], _hi[y])
+_lo = bytearray([WIDTH] * HEIGHT)
+_hi = bytearray(HEIGHT)
+# Span per row drawn since the last reset_buffer() and already flushed
+_used_lo = bytearray([WIDTH] * HEIGHT)
+_used_hi = bytearray(HEIGHT)
+# Span per row that was lit and got cleared, or whose LED state is unknown.
+# The LED state is unknown at import so everything starts stale.
+_stale_lo = bytearray(HEIGHT)
+_stale_hi = bytearray([WIDTH] * HEIGHT)
+# x, y of the sprite being blitted, for primitives.blit_runs
+_blit_at = array('i', [0, 0])
+
+# Flush statistics
+last_flush_bytes = 0
+last_flush_us = 0
+flush_count = 0
+total_flush_bytes = 0
+total_flush_us = 0
+frames_pushed = 0
+frames_skipped = 0
+
+
+def rgba_to_hex(color):
+    (r, g, b, alpha) = color
+    return pack_rgba(r, g, b, alpha)
+
+
+def rgb_to_hex(color):
+    (r, g, b) = color
+    return pack_rgb(r, g, b)
+
+
+def invalidate():
+    """Mark the whole screen dirty, call after drawing directly with rgb.*"""
+    global _shown_valid
+    _shown_valid = False
+    for y in range(HEIGHT):
+        _stale_lo[y] = 0
+        _stale_hi[y] = WIDTH
+
+
+def mark_dirty():
+    """Mark every row as drawn, for callers that wrote image_buffer directly."""
+    for y in range(HEIGHT):
+        _lo[y] = 0
+        _hi[y] = WIDTH
+
+
+def reset_buffer():
+    """Clear the buffer in place, the previously lit area becomes dirty."""
+    for y in range(HEIGHT):
+        if _used_lo[y] < _stale_lo[y]:
+            _stale_lo[y] = _used_lo[y]
+        if _used_hi[y] > _stale_hi[y]:
+            _stale_hi[y] = _used_hi[y]
+        _used_lo[y] = WIDTH
+        _used_hi[y] = 0
+        # Drawn but never flushed, nothing to undo on the LEDs
+        _lo[y] = WIDTH
+        _hi[y] = 0
+    image_buffer[:] = _blank
+
+
+def fill(color):
+    if color == 0:
+        reset_buffer()
+        return
+    fill_words(image_buffer, 0, SIZE, color)
+    mark_dirty()
+
+
+def set_index(i, color):
+    image_buffer[i] = color
+    y = i // WIDTH
+    x = i - y * WIDTH
+    if x < _lo[y]:
+        _lo[y] = x
+    if x >= _hi[y]:
+        _hi[y] = x + 1
+
+
+# set_pixel(x, y, color) sets one pixel, no bounds check
+primitives.bind(image_buffer, _lo, _hi)
+set_pixel = primitives.set_pixel
+
+
+def set_many(indices, color):
+    """Set every linear index in indices to the same color."""
+    buf = image_buffer
+    lo = _lo
+    hi = _hi
+    for i in indices:
+        buf[i] = color
+        y = i // WIDTH
+        x = i - y * WIDTH
+        if x < lo[y]:
+            lo[y] = x
+        if x >= hi[y]:
+            hi[y] = x + 1
+
+
+def hline(x, y, w, color):
+    """Horizontal line of w pixels starting at (x, y), clipped to the screen."""
+    if y < 0 or y >= HEIGHT:
+        return
+    if x < 0:
+        w += x
+        x = 0
+    if x + w > WIDTH:
+        w = WIDTH - x
+    if w <= 0:
+        return
+    start = y * WIDTH + x
+    fill_words(image_buffer, start, start + w, color)
+    if x < _lo[y]:
+        _lo[y] = x
+    if x + w > _hi[y]:
+        _hi[y] = x + w
+
+
+def vline(x, y, h, color):
+    """Vertical line of h pixels starting at (x, y), clipped to the screen."""
+    if x < 0 or x >= WIDTH:
+        return
+    if y < 0:
+        h += y
+        y = 0
+    if y + h > HEIGHT:
+        h = HEIGHT - y
+    if h > 0:
+        fill_column(x, y, h, color)
+
+
+def blit(sprite, x, y, color=None):
+    """Draw the set pixels of a Sprite with its top left corner at (x, y), clipped.
+
+    color, packed, overrides the sprite's own color without changing it.
+    """
+    _blit_at[0] = x
+    _blit_at[1] = y
+    blit_runs(image_buffer, sprite.runs, _blit_at, sprite.color if color is None else color)
+    # The sprite's box is marked dirty, rows are pushed as spans anyway
+    x0 = x if x > 0 else 0
+    x1 = x + sprite.width
+    if x1 > WIDTH:
+        x1 = WIDTH
+    if x0 >= x1:
+        return
+    for row in range(max(y, 0), min(y + sprite.height, HEIGHT)):
+        if x0 < _lo[row]:
+            _lo[row] = x0
+        if x1 > _hi[row]:
+            _hi[row] = x1
+
+
+def read_rect(x, y, w, h, dest, offset=0):
+    """Copy the w x h box at (x, y) into the array dest, row by row from offset."""
+    view = memoryview(dest)
+    for row in range(y, y + h):
+        start = row * WIDTH + x
+        view[offset:offset + w] = _buffer_view[start:start + w]
+        offset += w
+    return offset
+
+
+def prepare_pixel_global(pos, color):
+    """Tuple based setter kept for one-off pixels, prefer set_pixel in loops."""
+    (posx, posy) = pos
+    set_pixel(posx, posy, rgb_to_hex(color))
+
+
+def _push(x0, y0, x1, y1):
+    """Send the box [x0, x1) x [y0, y1) to the LEDs, returns the bytes sent."""
+    w = x1 - x0
+    h = y1 - y0
+    if w == WIDTH and h == HEIGHT:
+        rgb.image(image_buffer, pos=(0, 0), size=(WIDTH, HEIGHT))
+        return SIZE * 4
+    o = read_rect(x0, y0, w, h, _scratch)
+    rgb.image(_scratch_view[:o], pos=(x0, y0), size=(w, h))
+    return o * 4
+
+
+def render_image_buffer():
+    """Push the dirty area as a few boxes.
+
+    Consecutive dirty rows are merged into one box as long as the extra
+    columns cost less than a separate rgb.image call would. Nothing is sent
+    when the buffer still matches the last pushed frame.
+    """
+    global last_flush_bytes, last_flush_us, flush_count, total_flush_bytes, total_flush_us
+    global frames_pushed, frames_skipped, _shown_valid
+    start = ticks_us()
+    # Same pixels as the last pushed frame, one memcmp instead of any rgb.image
+    skip = _shown_valid and image_buffer == _shown
+    sent = 0
+    box_y = -1
+    box_lo = WIDTH
+    box_hi = 0
+    for y in range(HEIGHT):
+        lo = _lo[y]
+        hi = _hi[y]
+        if lo < hi:
+            if lo < _used_lo[y]:
+                _used_lo[y] = lo
+            if hi > _used_hi[y]:
+                _used_hi[y] = hi
+            _lo[y] = WIDTH
+            _hi[y] = 0
+        if _stale_lo[y] < _stale_hi[y]:
+            if _stale_lo[y] < lo:
+                lo = _stale_lo[y]
+            if _stale_hi[y] > hi:
+                hi = _stale_hi[y]
+            _stale_lo[y] = WIDTH
+            _stale_hi[y] = 0
+        if skip:
+            continue
+        if lo < hi:
+            if box_y >= 0:
+                rows = y - box_y
+                merged = (max(hi, box_hi) - min(lo, box_lo)) * (rows + 1)
+                if merged > (box_hi - box_lo) * rows + (hi - lo) + BOX_COST:
+                    sent += _push(box_lo, box_y, box_hi, y)
+                    box_y = -1
+            if box_y < 0:
+                box_y = y
+                box_lo = lo
+                box_hi = hi
+            else:
+                if lo < box_lo:
+                    box_lo = lo
+                if hi > box_hi:
+                    box_hi = hi
+        elif box_y >= 0:
+            sent += _push(box_lo, box_y, box_hi, y)
+            box_y = -1
+    if box_y >= 0:
+        sent += _push(box_lo, box_y, box_hi, HEIGHT)
+    if skip:
+        frames_skipped += 1
+    else:
+        _shown[:] = image_buffer
+        _shown_valid = True
+        frames_pushed += 1
+
+    last_flush_us = ticks_diff(ticks_us(), start)
+    last_flush_bytes = sent
+    flush_count += 1
+    total_flush_bytes += sent
+    total_flush_us += last_flush_us
+
+
+def flush_stats():
+    """Last and average flush size / duration as a printable line."""
+    frames = flush_count or 1
+    return 'flush: %d B %d us (avg %d B %d us over %d frames, full frame %d B), %d pushed %d skipped' % (
+        last_flush_bytes, last_flush_us, total_flush_bytes // frames, total_flush_us // frames,
+        flush_count, SIZE * 4, frames_pushed, frames_skipped)
+
+
+def average_level():
+    """Average channel value (0-255) of the last pushed frame, for duty cycle estimates."""
+    if not _shown_valid:
+        return 0
+    total = 0
+    for color in _shown:
+        total += (color >> 24) + ((color >> 16) & 0xff) + ((color >> 8) & 0xff)
+    return total // (SIZE * 3)
+
+
+def reset_flush_stats():
+    global flush_count, total_flush_bytes, total_flush_us, frames_pushed, frames_skipped
+    flush_count = 0
+    total_flush_bytes = 0
+    total_flush_us = 0
+    frames_pushed = 0
+    frames_skipped = 0
@@ -0,0 +1,111 @@
+# Matrix rain with a message on top, shared by kolab_game and n1ckname
+# The apps only differ in colors, brightness and what is drawn over the rain,
+# which are all constructor arguments.
+import random
+
+import rgb
+from .framebuffer import rgb_to_hex, invalidate, blit, render_image_buffer, WIDTH, HEIGHT
+from .matrixrain import MatrixRain, ROW
+from .sensors import accel_service
+from .power import power_policy
+from .debug import log
+from .messages import brucon_sprite
+
+CUSTOM_MESSAGE_RATE = 20
+FPS = 30
+# Same rain speed (20 rows/s) and trail length in rows as the old 20 fps version
+RAIN_SPEED = ROW * 20 // FPS
+RAIN_TRAIL = 6 * ROW // RAIN_SPEED
+
+GREEN = (0, 255, 0)
+CYAN = (0, 255, 255)
+KOLAB_BLUE = (11, 118, 187)
+
+
+def calc_cyan_columns(min_cyan=0, max_cyan=3):
+    """Randomly select columns to be cyan, between min_cyan and max_cyan."""
+    num_cyan = random.randint(min_cyan, max_cyan)
+    selected = set()
+    while len(selected) < num_cyan:
+        col = random.randint(0, WIDTH - 1)
+        selected.add(col)
+    cyan_columns = list(selected)
+    return cyan_columns
+
+
+class MatrixAnimation:
+    def __init__(self, custom_message=None, message=brucon_sprite, color=GREEN,
+                 message_color=KOLAB_BLUE, brightness=100, follow_accel=True, overlay=None):
+        """Matrix rain in color with message (a compiled Sprite) on top.
+
+        custom_message flashes in place of message about one frame in
+        CUSTOM_MESSAGE_RATE, either may be None. With follow_accel the text
+        slides around as the badge is tilted. overlay is called after every
+        frame is pushed, for drawing with rgb.* directly.
+        """
+        self.custom_message = custom_message
+        self.message = message
+        self.brightness = brightness
+        self.follow_accel = follow_accel
+        self.overlay = overlay
+        # Passed to blit, the sprites are shared and keep their own color
+        self.message_color = rgb_to_hex(message_color)
+        # Center on the custom message so both fit, like the text always did
+        self.box = custom_message or message
+        if self.box is not None:
+            self.message_x = (WIDTH - self.box.width) // 2
+            self.message_y = (HEIGHT - self.box.height) // 2
+        # Column kind 0 is the default color, kind 1 the cyan columns
+        self.rain = MatrixRain([color, CYAN], RAIN_TRAIL, RAIN_SPEED)
+
+    def buffer_custom_message(self):
+        self._buffer_message(self.custom_message)
+
+    def buffer_message(self):
+        self._buffer_message(self.message)
+
+    def _buffer_message(self, msg):
+        """Draw a message at its current position."""
+        if msg is not None:
+            blit(msg, self.message_x, self.message_y, self.message_color)
+
+    def update_message_position(self):
+        """Update the text position based on accelerometer input."""
+        ax, ay, az = accel_service().get_xyz()
+
+        # Adjust the sensitivity as needed
+        threshold = 5
+        if az < -threshold:  # Device held upright (neutral position)
+            self.message_x = (WIDTH - self.box.width) // 2
+            self.message_y = (HEIGHT - self.box.height) // 2
+        else:
+            if ax > threshold:  # Tilted right
+                self.message_x = max(0, self.message_x - 1)
+            elif ax < -threshold:  # Tilted left
+                self.message_x = min(WIDTH - self.box.width, self.message_x + 1)
+
+            if ay > threshold:  # Tilted forward
+                self.message_y = max(0, self.message_y - 1)
+            elif ay < -threshold:  # Tilted backward
+                self.message_y = min(HEIGHT - self.box.height, self.message_y + 1)
+
+    def start(self):
+        """Take over the screen, call before the first frame()."""
+        log("Entering ko_lab_matrix_animation")
+        rgb.clear()
+        invalidate()
+        power_policy().set_brightness(self.brightness)
+        self.rain.set_columns(calc_cyan_columns())  # Initialize cyan columns for the Matrix effect
+
+    def frame(self):
+        """Draw and push one frame, FPS times a second."""
+        self.rain.step()  # Draw the Matrix background, the text goes on top
+        if self.follow_accel and self.box is not None:
+            self.update_message_position()  # Update the text position based on accelerometer input
+        if self.custom_message is not None and random.randint(0, CUSTOM_MESSAGE_RATE) == CUSTOM_MESSAGE_RATE:
+            self.buffer_custom_message()
+        else:
+            self.buffer_message()
+        render_image_buffer()
+        if self.overlay:
+            self.overlay()
@@ -0,0 +1,74 @@
+# Matrix rain on a persistent intensity buffer
+# Pixels are PaletteBuffer values, column color entry * levels + level. Every
+# frame the whole buffer is darkened by one level through the fade table and
+# only the column heads are stamped at full level, the trails are what is left
+# of the earlier heads. Decay and the conversion to packed colors share one
+# pass over the buffer.
+from array import array
+from random import getrandbits
+
+from . import framebuffer
+from .framebuffer import WIDTH, HEIGHT
+from .palette import PaletteBuffer
+from .primitives import fade_convert
+
+# Column speeds are in 1/16 rows per frame
+ROW = 16
+
+
+class MatrixRain(PaletteBuffer):
+    def __init__(self, colors, trail=6, speed=ROW):
+        """colors holds the (r, g, b) head color per column kind, kind 0 is the default."""
+        # Level 0 is off, the head plus trail - 1 dimmer pixels light up behind it
+        super().__init__(colors, levels=trail + 1)
+        self.column_entry = bytearray(WIDTH)
+        self.column_speed = bytearray([speed] * WIDTH)
+        self.column_pos = array('H', [getrandbits(8) % HEIGHT * ROW for _ in range(WIDTH)])
+
+    def set_palette(self, colors, first=0):
+        """Trail pixel i behind the head is the head color divided by i + 1."""
+        levels = self.levels
+        lut = self.lut
+        for entry, (r, g, b) in enumerate(colors):
+            base = (first + entry) * levels
+            for level in range(1, levels):
+                div = levels - level
+                lut[base + level] = framebuffer.rgb_to_hex((r // div, g // div, b // div))
+
+    def set_columns(self, columns, entry=1):
+        """Draw the given columns in palette entry, the others in entry 0."""
+        for x in range(WIDTH):
+            self.column_entry[x] = entry if x in columns else 0
+
+    def set_speed(self, x, speed):
+        self.column_speed[x] = speed
+
+    def step(self):
+        """Advance one frame and write it to the shared framebuffer (not pushed)."""
+        pixels = self.pixels
+        lut = self.lut
+        buf = framebuffer.image_buffer
+        fade_convert(pixels, self.fade_table, lut, buf)
+
+        top = self.levels - 1
+        levels = self.levels
+        pos = self.column_pos
+        for x in range(WIDTH):
+            base = self.column_entry[x] * levels
+            old_row = pos[x] // ROW
+            p = (pos[x] + self.column_speed[x]) % (HEIGHT * ROW)
+            pos[x] = p
+            row = p // ROW
+            # Rows passed over this frame get the levels they would have had
+            # at one row per frame, the head row gets the full level
+            passed = (row - old_row) % HEIGHT
+            for behind in range(passed, -1, -1):
+                level = top - behind
+                if level < 1:
+                    continue
+                i = ((row - behind) % HEIGHT) * WIDTH + x
+                if behind == 0 or pixels[i] < base + level:
+                    pixels[i] = base + level
+                    buf[i] = lut[base + level]
+        framebuffer.mark_dirty()
+        return buf
@@ -1,3 +1,6 @@
+# Messages shared by the matrix animation apps
+from .sprite import from_lines
+
 kolab_message = [
     " K   K  OOO     L    AA  BBB  ",
     " K  K  O   O    L   A  A B  B ",
@@ -48,4 +51,11 @@ francis = [
     " KKK   O   O -- L   AAAA BBB  ",
     " K  K  O   O    L   A  A B  B ",
     " K   K  OOO     LLL A  A BBB  "
-]
\ No newline at end of file
+]
+
+# Compiled once at import, the apps draw these with framebuffer.blit()
+kolab_sprite = from_lines(kolab_message)
+winner_sprite = kolab_sprite
+kolab_bordered_sprite = from_lines(kolab_message_bordered.split('\n')[1:])  # Skip the first newline character
+loser_sprite = from_lines(loser_message)
+brucon_sprite = from_lines(brucon_message)
@@ -0,0 +1,53 @@
+# Deadline based frame pacing
+# Call start_frame() before a frame and end_frame() after it. end_frame()
+# returns only what is left of the frame budget, the render task awaits that
+# many ms, so the frame period does not drift with render cost.
+from .clock import ticks_ms, ticks_diff, ticks_add
+
+
+class FramePacer:
+    def __init__(self, fps):
+        self.set_fps(fps)
+        self.reset_stats()
+
+    def set_fps(self, fps):
+        self.fps = fps
+        self.period_ms = 1000 // fps
+        self.deadline = ticks_add(ticks_ms(), self.period_ms)
+
+    def reset_stats(self):
+        self.frames = 0
+        self.late_frames = 0
+        self.worst_ms = 0
+        self.window_start = ticks_ms()
+        self.frame_start = self.window_start
+
+    def end_frame(self):
+        """Account for the frame just done, returns the ms left of its budget."""
+        now = ticks_ms()
+        frame_ms = ticks_diff(now, self.frame_start)
+        if frame_ms > self.worst_ms:
+            self.worst_ms = frame_ms
+        self.frames += 1
+        remaining = ticks_diff(self.deadline, now)
+        if remaining > 0:
+            self.deadline = ticks_add(self.deadline, self.period_ms)
+            return remaining
+        # Missed the deadline, start counting again from now instead of
+        # rushing the next frames to catch up
+        self.late_frames += 1
+        self.deadline = ticks_add(now, self.period_ms)
+        return 0
+
+    def start_frame(self):
+        self.frame_start = ticks_ms()
+
+    def achieved_fps(self):
+        elapsed = ticks_diff(ticks_ms(), self.window_start)
+        if elapsed <= 0:
+            return 0
+        return self.frames * 1000 / elapsed
+
+    def stats(self):
+        return 'pacer: %.1f/%d fps, %d late of %d frames, worst %d ms' % (
+            self.achieved_fps(), self.fps, self.late_frames, self.frames, self.worst_ms)
@@ -0,0 +1,70 @@
+# Palette indexed framebuffer mode
+# Every pixel is one byte, entry * levels + level, looked up in a table of
+# packed colors that holds each palette entry at every brightness level.
+# Fading a pixel is decrementing its level, the packed 0xRRGGBBAA ints are
+# only produced once per flush.
+from array import array
+
+from . import framebuffer
+from .framebuffer import SIZE, WIDTH
+from .primitives import translate, lut_convert
+
+
+class PaletteBuffer:
+    def __init__(self, colors, levels=32, entries=None):
+        """entries is the room in the color table, len(colors) by default.
+
+        With room for two palettes, set_palette() can write the next one
+        next to the one on screen.
+        """
+        entries = entries or len(colors)
+        if entries * levels > 256:
+            raise ValueError("palette too big for one byte per pixel")
+        self.levels = levels
+        self.pixels = bytearray(SIZE)
+        self._blank = bytearray(SIZE)
+        # level_table[brightness] is the level for a 0-255 brightness
+        self.level_table = bytearray(b * (levels - 1) // 255 for b in range(256))
+        # fade_table[value] is value one level darker, level 0 stays put
+        self.fade_table = bytearray(i - 1 if i % levels else i for i in range(256))
+        self.lut = array('I', [0] * (entries * levels))
+        self.entries = entries
+        self.set_palette(colors)
+
+    def set_palette(self, colors, first=0):
+        """Write colors to the table from entry first on.
+
+        Pixels keep their entry and level, those of the other entries keep
+        their colors too.
+        """
+        levels = self.levels
+        top = levels - 1
+        lut = self.lut
+        for entry, (r, g, b) in enumerate(colors):
+            base = (first + entry) * levels
+            for level in range(levels):
+                lut[base + level] = framebuffer.rgb_to_hex(
+                    (r * level // top, g * level // top, b * level // top))
+
+    def value(self, entry, brightness):
+        """Pixel value for a palette entry at a 0-255 brightness."""
+        return entry * self.levels + self.level_table[brightness]
+
+    def clear(self):
+        self.pixels[:] = self._blank
+
+    def set_index(self, i, value):
+        self.pixels[i] = value
+
+    def set_pixel(self, x, y, value):
+        self.pixels[y * WIDTH + x] = value
+
+    def fade(self):
+        """Darken every pixel by one level."""
+        translate(self.pixels, self.fade_table)
+
+    def flush(self):
+        """Convert to packed colors in the shared framebuffer and push it."""
+        lut_convert(framebuffer.image_buffer, self.pixels, self.lut)
+        framebuffer.mark_dirty()
+        framebuffer.render_image_buffer()
@@ -0,0 +1,90 @@
+# Fixed capacity particle engine
+# Particle state lives in parallel arrays indexed by particle number, so an
+# update is a plain index loop over preallocated storage with no dicts, string
+# compares or tuples per particle.
+#
+# A particle sits on one pixel, brightens by speed until it reaches its
+# threshold, then fades back to 0 and respawns somewhere else with a new
+# palette entry and threshold.
+from array import array
+from random import getrandbits
+
+from .framebuffer import SIZE
+
+
+def _random_below(n):
+    # getrandbits is in MicroPython's random, randrange is optional there
+    return getrandbits(16) % n
+
+
+class Particles:
+    def __init__(self, capacity, entries, speed=4, size=SIZE):
+        if capacity > 0xffff or size > 0xffff:
+            raise ValueError("capacity and size must fit in 16 bits")
+        if speed < 1 or speed > 127:
+            raise ValueError("speed must be 1 to 127")
+        self.capacity = capacity
+        self.count = capacity
+        self.entries = entries
+        self.first = 0
+        self.size = size
+        self.pos = array('H', [0] * capacity)
+        self.level = bytearray(capacity)
+        # Signed brightness step per update, positive while brightening
+        self.speed = array('b', [0] * capacity)
+        self.entry = bytearray(capacity)
+        self.threshold = bytearray(capacity)
+        self.base_speed = speed
+        for i in range(capacity):
+            self.respawn(i)
+            self.level[i] = getrandbits(8)
+            if getrandbits(1):
+                self.speed[i] = -speed
+
+    def set_count(self, count):
+        """Number of live particles, up to the capacity."""
+        self.count = min(count, self.capacity)
+
+    def set_entries(self, entries, first=0):
+        """New particles take one of entries palette entries from first on.
+
+        Existing ones keep their entry until they respawn.
+        """
+        self.entries = entries
+        self.first = first
+
+    def respawn(self, i):
+        self.pos[i] = _random_below(self.size)
+        self.level[i] = 0
+        self.speed[i] = self.base_speed
+        self.entry[i] = self.first + _random_below(self.entries)
+        self.threshold[i] = getrandbits(8)
+
+    def update(self):
+        """Step every live particle once."""
+        level = self.level
+        speed = self.speed
+        threshold = self.threshold
+        for i in range(self.count):
+            step = speed[i]
+            b = level[i] + step
+            if step > 0:
+                if b >= threshold[i]:
+                    b = threshold[i]
+                    speed[i] = -step
+                level[i] = b
+            elif b <= 0:
+                self.respawn(i)
+            else:
+                level[i] = b
+
+    def draw(self, screen):
+        """Write every live particle into a PaletteBuffer, later particles win."""
+        pixels = screen.pixels
+        levels = screen.levels
+        level_table = screen.level_table
+        pos = self.pos
+        level = self.level
+        entry = self.entry
+        for i in range(self.count):
+            pixels[pos[i]] = entry[i] * levels + level_table[level[i]]
@@ -0,0 +1,105 @@
+# Battery aware power policy
+# As the battery drops below each threshold the policy steps down: apps get a
+# lower frame rate and a brightness cap, and step back up once it is charged
+# a few percent above the threshold again. The runtime asks the policy every
+# frame, which only reads the cached battery level.
+#
+# report() logs the estimated LED and CPU duty cycle and how long each level
+# was active, to compare how long the badge lasts at every level.
+import rgb
+from . import framebuffer
+from .clock import ticks_ms, ticks_diff
+from .sensors import battery_service
+
+# (battery % below which the level applies, % of the app's fps, max brightness)
+LEVELS = (
+    (101, 100, 100),
+    (40, 75, 60),
+    (20, 50, 30),
+    (10, 33, 15),
+)
+# Percent above a threshold before stepping back up, so a noisy reading
+# does not flip between two levels
+HYSTERESIS = 3
+
+
+class PowerPolicy:
+    def __init__(self, levels=LEVELS, hysteresis=HYSTERESIS):
+        self.levels = levels
+        self.hysteresis = hysteresis
+        self.battery = battery_service()
+        self.level = 0
+        # Battery sample the level was last picked for
+        self.seen = -1
+        # Brightness the app asked for, None until it sets one
+        self.requested = None
+        # ms spent at every level
+        self.level_ms = [0] * len(levels)
+        self.since = ticks_ms()
+        self.update()
+
+    def update(self):
+        """Move to the level for the current battery level, returns True when it changed."""
+        if self.battery.samples == self.seen:
+            return False
+        self.seen = self.battery.samples
+        if self.battery.backend is None:
+            # Nothing to go by, stay at full power
+            return False
+        percent = self.battery.level()
+        level = self.level
+        while level + 1 < len(self.levels) and percent < self.levels[level + 1][0]:
+            level += 1
+        while level > 0 and percent >= self.levels[level][0] + self.hysteresis:
+            level -= 1
+        if level == self.level:
+            return False
+        self._account()
+        self.level = level
+        if self.requested is None:
+            self.requested = rgb.getbrightness()
+        rgb.setbrightness(self.brightness(self.requested))
+        return True
+
+    def _account(self):
+        now = ticks_ms()
+        self.level_ms[self.level] += ticks_diff(now, self.since)
+        self.since = now
+
+    def fps(self, fps):
+        """Frame rate to run at for an app that wants fps."""
+        return max(1, fps * self.levels[self.level][1] // 100)
+
+    def brightness(self, brightness):
+        """brightness capped for the current level."""
+        return min(brightness, self.levels[self.level][2])
+
+    def set_brightness(self, brightness):
+        """rgb.setbrightness() for apps, capped now and after every level change."""
+        self.requested = brightness
+        rgb.setbrightness(self.brightness(brightness))
+
+    def report(self, busy_us=0, elapsed_us=0):
+        """Level, estimated duty cycles and time per level as a printable line.
+
+        LED duty is the brightness times the average channel level of the
+        last pushed frame, CPU duty is busy_us of elapsed_us.
+        """
+        self._account()
+        brightness = self.brightness(self.requested if self.requested is not None else rgb.getbrightness())
+        led = brightness * framebuffer.average_level() // 255
+        cpu = busy_us * 100 // elapsed_us if elapsed_us > 0 else 0
+        return 'power: level %d battery %d%%, brightness %d, LED duty ~%d%% CPU duty %d%%, s per level %s' % (
+            self.level, self.battery.level(), brightness, led, cpu,
+            '/'.join(str(ms // 1000) for ms in self.level_ms))
+
+
+_policy = None
+
+
+def power_policy():
+    """The shared policy, created with the battery service on first use."""
+    global _policy
+    if _policy is None:
+        _policy = PowerPolicy()
+    return _policy
@@ -0,0 +1,18 @@
+# Innermost drawing loops, picked for the interpreter we run on
+# On the badge they are the @micropython.viper versions from viper.py, on
+# CPython (the emulator) or a firmware without the native emitter they are the
+# pure Python ones from purepy.py. NATIVE tells which.
+import sys
+
+NATIVE = False
+if sys.implementation.name == 'micropython':
+    try:
+        from .viper import (bind, set_pixel, fill_column, fill_words, translate, lut_convert, fade_convert, blit_runs,
+                            pack_rgb, pack_rgba)
+        NATIVE = True
+    except (ImportError, SyntaxError, ValueError):
+        # Native code disabled in the firmware, or an .mpy built for another arch
+        pass
+if not NATIVE:
+    from .purepy import (bind, set_pixel, fill_column, fill_words, translate, lut_convert, fade_convert, blit_runs,
+                         pack_rgb, pack_rgba)
@@ -0,0 +1,58 @@
+# Per phase frame profiler
+# Durations are kept in preallocated ring buffers so recording a sample does
+# not allocate, statistics are only computed when a report is printed.
+from array import array
+
+from .clock import ticks_us, ticks_diff
+
+UPDATE, BUFFER, FLUSH, SENSOR = 0, 1, 2, 3
+PHASE_NAMES = ('update', 'buffer', 'flush', 'sensor')
+
+
+class Profiler:
+    def __init__(self, names=PHASE_NAMES, samples=64, report_every=0):
+        """Phases are addressed by their index in names.
+
+        With report_every set, frame_done() prints a report every that many frames.
+        """
+        self.names = names
+        self.samples = samples
+        self.report_every = report_every
+        self.durations = [array('I', [0] * samples) for _ in names]
+        self.starts = array('i', [0] * len(names))
+        self.counts = array('I', [0] * len(names))
+        self.frames = 0
+
+    def begin(self, phase):
+        self.starts[phase] = ticks_us()
+
+    def end(self, phase):
+        elapsed = ticks_diff(ticks_us(), self.starts[phase])
+        count = self.counts[phase]
+        self.durations[phase][count % self.samples] = elapsed
+        self.counts[phase] = count + 1
+
+    def frame_done(self):
+        self.frames += 1
+        if self.report_every and self.frames % self.report_every == 0:
+            self.report()
+
+    def phase_stats(self, phase):
+        """(min, avg, p95, max) in us over the samples in the ring, None when empty."""
+        n = min(self.counts[phase], self.samples)
+        if n == 0:
+            return None
+        values = sorted(self.durations[phase][:n])
+        return values[0], sum(values) // n, values[(n * 95 - 1) // 100], values[-1]
+
+    def report(self):
+        print('profile after %d frames (us: min/avg/p95/max)' % self.frames)
+        for phase, name in enumerate(self.names):
+            stats = self.phase_stats(phase)
+            if stats:
+                print('  %-8s %6d %6d %6d %6d' % ((name,) + stats))
+
+    def reset(self):
+        for phase in range(len(self.names)):
+            self.counts[phase] = 0
+        self.frames = 0
@@ -0,0 +1,90 @@
+# Pure Python versions of the primitives, see primitives.py
+# Every function has the same arguments as its viper twin in viper.py.
+
+WIDTH, HEIGHT = 32, 19
+
+_buf = None
+_lo = None
+_hi = None
+
+
+def bind(buf, lo, hi):
+    """Buffers set_pixel writes to, the framebuffer and its dirty spans."""
+    global _buf, _lo, _hi
+    _buf = buf
+    _lo = lo
+    _hi = hi
+
+
+def set_pixel(x, y, color):
+    """Set one pixel, no bounds check."""
+    _buf[y * WIDTH + x] = color
+    if x < _lo[y]:
+        _lo[y] = x
+    if x >= _hi[y]:
+        _hi[y] = x + 1
+
+
+def fill_column(x, y, h, color):
+    """Set h pixels down from (x, y), no bounds check."""
+    buf = _buf
+    lo = _lo
+    hi = _hi
+    for row in range(y, y + h):
+        buf[row * WIDTH + x] = color
+        if x < lo[row]:
+            lo[row] = x
+        if x >= hi[row]:
+            hi[row] = x + 1
+
+
+def fill_words(buf, start, end, value):
+    for i in range(start, end):
+        buf[i] = value
+
+
+def translate(buf, table):
+    """buf[i] = table[buf[i]] for a bytearray."""
+    for i in range(len(buf)):
+        buf[i] = table[buf[i]]
+
+
+def lut_convert(dst, src, lut):
+    """dst[i] = lut[src[i]], bytes to packed colors."""
+    for i in range(len(src)):
+        dst[i] = lut[src[i]]
+
+
+def fade_convert(pixels, table, lut, dst):
+    """translate() and lut_convert() in one pass."""
+    for i in range(len(pixels)):
+        v = table[pixels[i]]
+        pixels[i] = v
+        dst[i] = lut[v]
+
+
+def blit_runs(buf, runs, ctx, color):
+    """Draw (y, x, length) runs at ctx[0], ctx[1] in color, clipped."""
+    x = ctx[0]
+    y = ctx[1]
+    for i in range(0, len(runs), 3):
+        row = y + runs[i]
+        if row < 0 or row >= HEIGHT:
+            continue
+        x0 = x + runs[i + 1]
+        x1 = x0 + runs[i + 2]
+        if x0 < 0:
+            x0 = 0
+        if x1 > WIDTH:
+            x1 = WIDTH
+        start = row * WIDTH
+        for j in range(start + x0, start + x1):
+            buf[j] = color
+
+
+def pack_rgb(r, g, b):
+    return (r << 24) | (g << 16) | (b << 8)
+
+
+def pack_rgba(r, g, b, a):
+    return (r << 24) | (g << 16) | (b << 8) | a
@@ -0,0 +1,211 @@
+# Input record / replay
+# record(path) seeds random and logs every button event and accelerometer
+# sample an app gets to a small binary file, replay(path) reseeds random and
+# feeds them back instead of the buttons and the sensor. Both have to run
+# before the app is imported, the Runtime and AccelService pick the session
+# up when they are created.
+#
+#     >>> from badgelib import replay
+#     >>> replay.record('/kolab.rec')
+#     >>> import kolab_game
+#
+# Input is keyed by step, the number of every() ticks the runtime ran before
+# it, not by time. The replay applies it between the same two ticks, so an
+# app whose state only changes in one every() callback and its button
+# handlers goes through the same states however fast or slow the build is.
+# Renders are not steps, on the badge how many run between two ticks depends
+# on timing: state a render function keeps, or random numbers it draws, can
+# differ, and it sees input one tick late. So does the order of several
+# every() callbacks, and a late tick skips periods. Only the emulator's
+# virtual clock repeats all of that exactly. Time based app logic and the
+# power policy still follow the clock and the battery. The seed reproduces
+# random only on the interpreter that recorded it, MicroPython and CPython
+# differ.
+#
+# File: MAGIC, the seed as a little endian uint32, then records of a kind
+# byte, the steps since the previous record and, for ACCEL, x, y, z as int16.
+import random
+import struct
+
+from .debug import log
+
+MAGIC = b'BRR\x01'
+# Kinds, a button event is BUTTON | button, plus DOWN for a press
+BUTTON = 0x00
+DOWN = 0x08
+ACCEL = 0x10
+# Handlers of the button events since the previous DRAIN run here
+DRAIN = 0x20
+# Only moves the step forward, for gaps of more than 255 steps
+SKIP = 0x30
+END = 0x40
+# File buffer, records are written and read in chunks of this many bytes
+CHUNK = 256
+
+
+class Session:
+    def __init__(self, path, recording):
+        self.path = path
+        self.recording = recording
+        self.replaying = not recording
+        # every() ticks done, the runtime counts them
+        self.steps = 0
+        # Step of the last record written, or of the next one to apply
+        self.at = 0
+        self.records = 0
+        self.buf = bytearray(CHUNK)
+        self.view = memoryview(self.buf)
+        self.pos = 0
+        self.end = 0
+        self.accel = None
+        if recording:
+            self.seed = random.getrandbits(30)
+            self.file = open(path, 'wb')
+            self.file.write(MAGIC)
+            self.file.write(struct.pack('<I', self.seed))
+        else:
+            self.file = open(path, 'rb')
+            header = self.file.read(8)
+            if header[:4] != MAGIC:
+                raise ValueError('not a recording: %s' % path)
+            self.seed = struct.unpack('<I', header[4:])[0]
+            self._next()
+        random.seed(self.seed)
+
+    # --- recording ---
+    def _put(self, kind, delta, size):
+        if self.pos + size > CHUNK:
+            self.flush()
+        pos = self.pos
+        self.buf[pos] = kind
+        self.buf[pos + 1] = delta
+        self.pos = pos + size
+        return pos
+
+    def _write(self, kind, size=2):
+        """Start a record of size bytes at the current step, returns its offset in buf."""
+        delta = self.steps - self.at
+        while delta > 255:
+            self._put(SKIP, 255, 2)
+            delta -= 255
+        self.at = self.steps
+        self.records += 1
+        return self._put(kind, delta, size)
+
+    def record_events(self, queue):
+        """Log the events waiting in an EventQueue, before it runs their handlers."""
+        i = queue.head
+        while i != queue.tail:
+            self._write(BUTTON | queue.button[i] | (DOWN if queue.down[i] else 0))
+            i = (i + 1) % queue.size
+
+    def record_drain(self):
+        self._write(DRAIN)
+
+    def record_accel(self, xyz):
+        """Log a raw accelerometer sample, 16 bit like the sensor's."""
+        x, y, z = xyz
+        struct.pack_into('<hhh', self.buf, self._write(ACCEL, 8) + 2, x, y, z)
+
+    def flush(self):
+        if self.recording and self.pos:
+            self.file.write(self.view[:self.pos])
+            self.pos = 0
+
+    # --- replay ---
+    def _fill(self, size):
+        """Make size bytes available at pos, False at the end of the file."""
+        left = self.end - self.pos
+        if left >= size:
+            return True
+        self.buf[:left] = self.buf[self.pos:self.end]
+        self.pos = 0
+        self.end = left + (self.file.readinto(self.view[left:]) or 0)
+        return self.end >= size
+
+    def _next(self):
+        """Read the next record into kind, at and xyz. A truncated file ends like END."""
+        while self._fill(2):
+            kind = self.buf[self.pos]
+            self.at += self.buf[self.pos + 1]
+            self.pos += 2
+            if kind == SKIP:
+                continue
+            if kind == ACCEL:
+                if not self._fill(6):
+                    break
+                self.xyz = struct.unpack_from('<hhh', self.buf, self.pos)
+                self.pos += 6
+            self.kind = kind
+            return
+        self.kind = END
+
+    def begin(self, runtime):
+        """Apply the input recorded before the coming every() tick.
+
+        Returns False, after stopping the runtime, once the recording is over.
+        """
+        if not self.replaying:
+            return True
+        while self.at == self.steps:
+            kind = self.kind
+            if kind < ACCEL:
+                runtime.events.inject(kind & 7, kind & DOWN)
+            elif kind == ACCEL:
+                if self.accel is None:
+                    # Imported here, sensors imports this module
+                    from .sensors import accel_service
+                    self.accel = accel_service()
+                self.accel.sample(self.xyz)
+            elif kind == DRAIN:
+                runtime.drain()
+            else:
+                runtime.stop()
+                self.close()
+                return False
+            self.records += 1
+            self._next()
+        return True
+
+    def close(self):
+        if self.file is None:
+            return
+        if self.recording:
+            self._write(END)
+            self.flush()
+        self.file.close()
+        self.file = None
+        log('%s %s: %d steps, %d records, seed %d' % (
+            'recorded' if self.recording else 'replayed', self.path, self.steps, self.records, self.seed))
+
+
+_session = None
+
+
+def record(path):
+    """Record the input of the next app to path."""
+    global _session
+    stop()
+    _session = Session(path, True)
+    return _session
+
+
+def replay(path):
+    """Feed the input recorded in path to the next app."""
+    global _session
+    stop()
+    _session = Session(path, False)
+    return _session
+
+
+def active_session():
+    """The session started by record() or replay(), None when there is none."""
+    return _session
+
+
+def stop():
+    """Close the session, the apps started after this get live input again."""
+    global _session
+    if _session is not None:
+        _session.close()
+        _session = None
@@ -0,0 +1,214 @@
+# Cooperative app runtime on (u)asyncio
+# Instead of one while True loop doing input, sensors, game logic and drawing
+# in lockstep, each runs as its own task at its own rate. Button callbacks
+# only queue the press and wake the input task, which runs the app's handler
+# and renders straight away instead of at the next frame. Handlers therefore
+# always run between tasks, never in the middle of an update or a render.
+#
+# The frame rate is the app's rate as adjusted by the power policy, which is
+# checked every frame, and the time spent in tasks is logged as CPU duty.
+#
+# Every every() call is a step, renders are not: how many frames run between
+# two ticks depends on timing. With a badgelib.replay session active the
+# runtime counts the steps, logs the input drained between them or,
+# replaying, applies the logged input between the same steps instead of the
+# buttons'.
+#
+#     runtime = Runtime()
+#     runtime.on_button(buttons.BTN_A, jump)
+#     runtime.every(100, update)
+#     runtime.render(30, draw)
+#     runtime.run()
+try:
+    import asyncio
+except ImportError:
+    import uasyncio as asyncio
+import buttons
+from .clock import ticks_ms, ticks_us, ticks_diff, ticks_add
+from .debug import log
+from .events import EventQueue
+from .pacer import FramePacer
+from .power import power_policy
+from .replay import active_session
+
+
+# Renders run this long after the update tasks, so a tick that is due for
+# both draws the state of that tick and not of the previous one
+RENDER_LAG_MS = 1
+# How often the power policy logs its duty cycle estimates
+POWER_LOG_MS = 60000
+
+if hasattr(asyncio, 'sleep_ms'):
+    sleep_ms = asyncio.sleep_ms
+else:
+    def sleep_ms(ms):
+        return asyncio.sleep(ms / 1000)
+
+
+def _flag():
+    # ThreadSafeFlag can be set from an interrupt, CPython's event loop runs
+    # the callbacks itself
+    if hasattr(asyncio, 'ThreadSafeFlag'):
+        return asyncio.ThreadSafeFlag()
+    return asyncio.Event()
+
+
+class Runtime:
+    def __init__(self):
+        self.running = False
+        self.periodic = []
+        self.render_fn = None
+        self.pacer = None
+        self.events = EventQueue()
+        # ms until a bounced button settles, -1 when none is
+        self.settle_ms = -1
+        # Press to rendered frame, oldest press of every batch
+        self.input_batches = 0
+        self.input_total_us = 0
+        self.input_worst_us = 0
+        self.power = power_policy()
+        self.session = active_session()
+        # Time spent in tasks since the last power log
+        self.busy_us = 0
+        self.busy_since = ticks_us()
+        self._wake = _flag()
+        self._done = None
+        self._tasks = []
+
+    def every(self, period_ms, fn):
+        """Call fn() every period_ms, the first time one period after run()."""
+        self.periodic.append((period_ms, fn))
+
+    def render(self, fps, fn):
+        """Call fn() fps times a second and after every batch of button presses."""
+        self.render_fn = fn
+        self.fps = fps
+
+    def set_fps(self, fps):
+        self.fps = fps
+        if self.pacer is not None:
+            self.pacer.set_fps(self.power.fps(fps))
+
+    def on_button(self, button, handler):
+        """Call handler(down) from the input task for presses and releases of button."""
+        self.events.handlers[button] = handler
+        if self.session is not None and self.session.replaying:
+            # Only the recorded presses reach the handlers
+            return
+        buttons.register(button, lambda down: self._queue(button, down))
+
+    def _queue(self, button, down):
+        if self.events.push(button, down):
+            self._wake.set()
+
+    def drain(self):
+        """Run the handlers of the queued input, then render once if anything was pressed."""
+        session = self.session
+        # Edges held back by the debounce window whose window is over
+        self.settle_ms = self.events.settle()
+        recording = session is not None and session.recording and self.events.pending()
+        if recording:
+            session.record_events(self.events)
+        first = self.events.drain()
+        if recording:
+            # After the handlers, the samples they took are replayed before them
+            session.record_drain()
+        if first < 0 or not self.running:
+            return
+        if self.render_fn is not None:
+            self.render_fn()
+        latency = ticks_diff(ticks_us(), first)
+        self.input_batches += 1
+        self.input_total_us += latency
+        if latency > self.input_worst_us:
+            self.input_worst_us = latency
+
+    async def _input(self):
+        while self.running:
+            if self.settle_ms < 0:
+                await self._wake.wait()
+            else:
+                # A bounced button, look at the level it settled on
+                await sleep_ms(self.settle_ms)
+            self._wake.clear()
+            start = ticks_us()
+            self.drain()
+            self.busy_us += ticks_diff(ticks_us(), start)
+
+    async def _every(self, period_ms, fn, step=True):
+        # The runtime's own tasks are not steps, they do not touch the app
+        session = self.session if step else None
+        deadline = ticks_add(ticks_ms(), period_ms)
+        while self.running:
+            delay = ticks_diff(deadline, ticks_ms())
+            if delay > 0:
+                await sleep_ms(delay)
+            if session is not None and not session.begin(self):
+                break
+            start = ticks_us()
+            fn()
+            self.busy_us += ticks_diff(ticks_us(), start)
+            if session is not None:
+                session.steps += 1
+            deadline = ticks_add(deadline, period_ms)
+            if ticks_diff(deadline, ticks_ms()) <= 0:
+                # Late, skip the missed periods instead of running them back to back
+                deadline = ticks_add(ticks_ms(), period_ms)
+
+    async def _render(self):
+        await sleep_ms(RENDER_LAG_MS)
+        self.pacer = FramePacer(self.power.fps(self.fps))
+        while self.running:
+            start = ticks_us()
+            if self.power.update():
+                self.pacer.set_fps(self.power.fps(self.fps))
+            self.render_fn()
+            self.busy_us += ticks_diff(ticks_us(), start)
+            await sleep_ms(self.pacer.end_frame())
+            self.pacer.start_frame()
+
+    def _log_power(self):
+        now = ticks_us()
+        log(self.power.report(self.busy_us, ticks_diff(now, self.busy_since)))
+        self.busy_us = 0
+        self.busy_since = now
+
+    async def _main(self):
+        self._done = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._input())]
+        battery = self.power.battery
+        if battery.timer is None and battery.backend is not None:
+            # No hardware timer to sample the battery from, a task does it instead
+            self._tasks.append(asyncio.create_task(self._every(battery.period_ms, battery.sample, False)))
+        self._tasks.append(asyncio.create_task(self._every(POWER_LOG_MS, self._log_power, False)))
+        for period_ms, fn in self.periodic:
+            self._tasks.append(asyncio.create_task(self._every(period_ms, fn)))
+        if self.render_fn is not None:
+            self._tasks.append(asyncio.create_task(self._render()))
+        await self._done.wait()
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    def run(self):
+        """Run the tasks until stop() is called."""
+        self.running = True
+        try:
+            asyncio.run(self._main())
+        finally:
+            if self.session is not None:
+                self.session.close()
+
+    def stop(self):
+        """End run() once the calling task or handler returns."""
+        self.running = False
+        if self._done is not None:
+            self._done.set()
+
+    def stats(self):
+        batches = self.input_batches or 1
+        line = 'input: %d batches, avg %d us worst %d us to the frame, %s' % (
+            self.input_batches, self.input_total_us // batches, self.input_worst_us, self.events.stats())
+        if self.pacer is None:
+            return line
+        return self.pacer.stats() + ', ' + line
@@ -0,0 +1,201 @@
+# Accelerometer and battery sampling services
+# The sensor is initialised once and sampled at a fixed rate from a hardware
+# timer into a small ring buffer, with a low-pass filtered value kept next to
+# it. Apps read the filtered value, which never touches I2C on the render path.
+#
+# Without machine.Timer (the emulator, or no free timer) or while input is
+# recorded or replayed, a sample is taken when the value is read and the
+# sample period has passed.
+#
+# The battery is probed once for a way to read it and then sampled every few
+# seconds into a moving average. Reads only return the cached percentage,
+# without a timer the app runs sample() from a task.
+from array import array
+
+import accel
+from .clock import ticks_ms, ticks_diff
+from .debug import log
+from .replay import active_session
+
+# Hardware timers used for sampling on the ESP32
+TIMER_ID = 0
+BATTERY_TIMER_ID = 1
+
+
+class AccelService:
+    def __init__(self, hz=50, shift=2, samples=16):
+        """Sample at hz, each sample moves the filtered value 1 / 2**shift of the way."""
+        self.period_ms = 1000 // hz
+        self.shift = shift
+        self.size = samples
+        # x, y, z of the last samples, oldest overwritten first
+        self.ring = array('i', [0] * (samples * 3))
+        self.head = 0
+        self.count = 0
+        self.x = self.y = self.z = 0
+        self.last_sample = ticks_ms()
+        self.timer = None
+        self.session = active_session()
+        accel.init()
+        self.sample()
+        if self.session is not None:
+            # Recording or replaying, no timer: samples are only taken when
+            # read or by a runtime task, at the same steps in both
+            return
+        try:
+            from machine import Timer
+            self.timer = Timer(TIMER_ID)
+            self.timer.init(period=self.period_ms, mode=Timer.PERIODIC, callback=self._tick)
+        except (ImportError, ValueError, OSError):
+            self.timer = None
+
+    def _tick(self, timer):
+        self.sample()
+
+    def sample(self, xyz=None):
+        """Read the sensor once into the ring and the filter, or add xyz, a sample taken elsewhere."""
+        if xyz is None:
+            session = self.session
+            if session is not None:
+                if session.replaying:
+                    # The session adds the recorded samples instead
+                    return
+                xyz = accel.get_xyz()
+                session.record_accel(xyz)
+            else:
+                xyz = accel.get_xyz()
+        ax, ay, az = xyz
+        ring = self.ring
+        i = self.head * 3
+        ring[i] = ax
+        ring[i + 1] = ay
+        ring[i + 2] = az
+        self.head = (self.head + 1) % self.size
+        shift = self.shift
+        if self.count == 0:
+            self.x, self.y, self.z = ax, ay, az
+        else:
+            self.x += (ax - self.x) >> shift
+            self.y += (ay - self.y) >> shift
+            self.z += (az - self.z) >> shift
+        if self.count < self.size:
+            self.count += 1
+        self.last_sample = ticks_ms()
+
+    def _poll(self):
+        if self.timer is None and ticks_diff(ticks_ms(), self.last_sample) >= self.period_ms:
+            self.sample()
+
+    def get_xyz(self):
+        """Filtered (x, y, z) in the units of accel.get_xyz()."""
+        self._poll()
+        return self.x, self.y, self.z
+
+    def raw(self, age=0):
+        """Unfiltered sample, age 0 is the newest."""
+        self._poll()
+        i = (self.head - 1 - age) % self.size * 3
+        return self.ring[i], self.ring[i + 1], self.ring[i + 2]
+
+    def stop(self):
+        if self.timer is not None:
+            self.timer.deinit()
+            self.timer = None
+
+
+_service = None
+
+
+def accel_service():
+    """The shared service, started (and the sensor initialised) on first use."""
+    global _service
+    if _service is None:
+        _service = AccelService()
+    return _service
+
+
+def _probe_battery():
+    """(name, read function returning a percentage) of the first backend that reads, or (None, None)."""
+    try:
+        import battery
+        battery.read_batt_percentage()
+        return 'battery', battery.read_batt_percentage
+    except Exception:
+        pass
+    try:
+        import machine
+    except ImportError:
+        return None, None
+    # ADC pins commonly used for the battery, the reading is approximate
+    for channel in (0, 4):
+        try:
+            adc = machine.ADC(channel)
+            adc.read_u16()
+            return 'machine', lambda: adc.read_u16() * 100 // 65535
+        except Exception:
+            pass
+    return None, None
+
+
+class BatteryService:
+    def __init__(self, period_ms=10000, samples=6):
+        """Sample every period_ms, level() is the average of the last samples."""
+        self.period_ms = period_ms
+        self.backend, self.read = _probe_battery()
+        log('Battery backend: %s' % self.backend)
+        self.ring = bytearray(samples)
+        self.head = 0
+        self.count = 0
+        self.total = 0
+        # Samples taken so far, to notice a new one without reading the level
+        self.samples = 0
+        self.timer = None
+        if self.read is None:
+            return
+        self.sample()
+        try:
+            from machine import Timer
+            self.timer = Timer(BATTERY_TIMER_ID)
+            self.timer.init(period=period_ms, mode=Timer.PERIODIC, callback=self._tick)
+        except (ImportError, ValueError, OSError):
+            self.timer = None
+
+    def _tick(self, timer):
+        self.sample()
+
+    def sample(self):
+        """Read the battery once into the moving average."""
+        if self.read is None:
+            return
+        percent = min(max(int(self.read()), 0), 100)
+        size = len(self.ring)
+        if self.count == size:
+            self.total -= self.ring[self.head]
+        else:
+            self.count += 1
+        self.ring[self.head] = percent
+        self.total += percent
+        self.head = (self.head + 1) % size
+        self.samples += 1
+
+    def level(self):
+        """Averaged percentage, 0 without a backend. Never reads the battery."""
+        if self.count == 0:
+            return 0
+        return self.total // self.count
+
+    def stop(self):
+        if self.timer is not None:
+            self.timer.deinit()
+            self.timer = None
+
+
+_battery = None
+
+
+def battery_service():
+    """The shared battery service, probed on first use."""
+    global _battery
+    if _battery is None:
+        _battery = BatteryService()
+    return _battery
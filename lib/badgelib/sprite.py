@@ -0,0 +1,47 @@
+# Bit-packed one color sprites, drawn with framebuffer.blit()
+from array import array
+
+
+class Sprite:
+    """Bit x of rows[y] is set when the pixel at (x, y) is drawn.
+
+    The set pixels are also stored as horizontal runs, (y, x, length)
+    triples, so blitting fills whole runs instead of testing every bit.
+    """
+
+    def __init__(self, rows, width, color=0):
+        self.rows = array('I', rows)
+        self.width = width
+        self.height = len(rows)
+        runs = []
+        for y, row in enumerate(rows):
+            x = 0
+            while x < width:
+                if row >> x & 1:
+                    start = x
+                    while x < width and row >> x & 1:
+                        x += 1
+                    runs.extend((y, start, x - start))
+                else:
+                    x += 1
+        self.runs = bytes(runs)
+        self.set_color(color)
+
+    def set_color(self, color):
+        self.color = color
+
+    def pixel(self, x, y):
+        return self.rows[y] >> x & 1
+
+
+def from_lines(lines, color=0, blank=' '):
+    """Compile ASCII art, any character other than blank is a set pixel."""
+    width = max(len(line) for line in lines)
+    rows = []
+    for line in lines:
+        row = 0
+        for x, char in enumerate(line):
+            if char != blank:
+                row |= 1 << x
+        rows.append(row)
+    return Sprite(rows, width, color)
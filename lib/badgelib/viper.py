@@ -0,0 +1,130 @@
+# Viper versions of the primitives, MicroPython only, see primitives.py
+# Same arguments as purepy.py. The loops compile to machine code working on
+# raw pointers into the array/bytearray buffers, and the packed colors never
+# become big ints until the value is returned.
+import micropython
+
+WIDTH = const(32)
+HEIGHT = const(19)
+
+_buf = None
+_lo = None
+_hi = None
+
+
+def bind(buf, lo, hi):
+    global _buf, _lo, _hi
+    _buf = buf
+    _lo = lo
+    _hi = hi
+
+
+@micropython.viper
+def set_pixel(x: int, y: int, color: uint):
+    buf = ptr32(_buf)
+    lo = ptr8(_lo)
+    hi = ptr8(_hi)
+    buf[y * WIDTH + x] = color
+    if x < lo[y]:
+        lo[y] = x
+    if x >= hi[y]:
+        hi[y] = x + 1
+
+
+@micropython.viper
+def fill_column(x: int, y: int, h: int, color: uint):
+    buf = ptr32(_buf)
+    lo = ptr8(_lo)
+    hi = ptr8(_hi)
+    row = y
+    end = y + h
+    while row < end:
+        buf[row * WIDTH + x] = color
+        if x < lo[row]:
+            lo[row] = x
+        if x >= hi[row]:
+            hi[row] = x + 1
+        row += 1
+
+
+@micropython.viper
+def fill_words(buf, start: int, end: int, value: uint):
+    p = ptr32(buf)
+    i = start
+    while i < end:
+        p[i] = value
+        i += 1
+
+
+@micropython.viper
+def translate(buf, table):
+    p = ptr8(buf)
+    t = ptr8(table)
+    n = int(len(buf))
+    i = 0
+    while i < n:
+        p[i] = t[p[i]]
+        i += 1
+
+
+@micropython.viper
+def lut_convert(dst, src, lut):
+    d = ptr32(dst)
+    s = ptr8(src)
+    l = ptr32(lut)
+    n = int(len(src))
+    i = 0
+    while i < n:
+        d[i] = l[s[i]]
+        i += 1
+
+
+@micropython.viper
+def fade_convert(pixels, table, lut, dst):
+    p = ptr8(pixels)
+    t = ptr8(table)
+    l = ptr32(lut)
+    d = ptr32(dst)
+    n = int(len(pixels))
+    i = 0
+    while i < n:
+        v = t[p[i]]
+        p[i] = v
+        d[i] = l[v]
+        i += 1
+
+
+@micropython.viper
+def blit_runs(buf, runs, ctx, color: uint):
+    p = ptr32(buf)
+    r = ptr8(runs)
+    c = ptr32(ctx)
+    x = int(c[0])
+    y = int(c[1])
+    n = int(len(runs))
+    i = 0
+    while i < n:
+        row = y + r[i]
+        if row >= 0 and row < HEIGHT:
+            x0 = x + r[i + 1]
+            x1 = x0 + r[i + 2]
+            if x0 < 0:
+                x0 = 0
+            if x1 > WIDTH:
+                x1 = WIDTH
+            j = row * WIDTH + x0
+            end = row * WIDTH + x1
+            while j < end:
+                p[j] = color
+                j += 1
+        i += 3
+
+
+@micropython.viper
+def pack_rgb(r: int, g: int, b: int) -> uint:
+    return uint((r << 24) | (g << 16) | (b << 8))
+
+
+@micropython.viper
+def pack_rgba(r: int, g: int, b: int, a: int) -> uint:
+    return uint((r << 24) | (g << 16) | (b << 8) | a)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Compile badge modules to .mpy bytecode before uploading them
+
+    python3 precompile.py [--arch xtensawin] [--measure PORT] DIR...
+
+Every DIR/*.py is compiled with mpy-cross into build/DIR/*.mpy, a module that
+fails to compile (or all of them when mpy-cross is missing) is copied to
+build/DIR as .py so the upload still works. The upload scripts then copy
+build/DIR to the badge.
+
+The gold firmware is MicroPython v1.23, which loads .mpy v6.3 as emitted by
+pip3 install mpy-cross==1.23.0 (or any later mpy-cross for v6.3). Set
+MPY_CROSS to pick a specific binary and NO_MPY=1 to upload plain sources.
+The upload scripts remove the .py of every uploaded .mpy, so an mpy-cross
+emitting any other version aborts the build instead.
+"""
+import argparse
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+
+BUILD_DIR = 'build'
+# ESP32-S2, only matters for @micropython.native / viper code
+DEFAULT_ARCH = 'xtensawin'
+# Modules that are read as source on the badge, not imported
+KEEP_SOURCE = ('icon.py',)
+# Scratch file on the badge for --measure
+MEASURE_FILE = '/precompile_measure.py'
+# .mpy version the gold firmware's MicroPython v1.23 loads
+MPY_VERSION = '6.3'
+
+
+def find_mpy_cross():
+    command = os.environ.get('MPY_CROSS')
+    if command:
+        return command.split()
+    if shutil.which('mpy-cross'):
+        return ['mpy-cross']
+    # pip3 install mpy-cross ships the binary inside a python package
+    try:
+        import mpy_cross  # noqa: F401
+        return [sys.executable, '-m', 'mpy_cross']
+    except ImportError:
+        return None
+
+
+def mpy_version(mpy_cross):
+    """The .mpy version mpy_cross emits, like '6.3', None when it doesn't say."""
+    proc = subprocess.run(mpy_cross + ['--version'], stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                          universal_newlines=True)
+    # MicroPython v1.23.0 on 2024-06-02; mpy-cross emitting mpy v6.3
+    match = re.search(r'mpy v(\d+\.\d+)', proc.stdout)
+    return match.group(1) if match else None
+
+
+def compile_dir(src_dir, mpy_cross, arch):
+    """Compile one directory, returns [(name, py bytes, uploaded bytes, compiled)]."""
+    out_dir = os.path.join(BUILD_DIR, src_dir)
+    if os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
+    os.makedirs(out_dir)
+    results = []
+    for name in sorted(os.listdir(src_dir)):
+        src = os.path.join(src_dir, name)
+        if not os.path.isfile(src) or name.startswith('test_'):
+            # Host side test scripts stay off the badge
+            continue
+        if not name.endswith('.py') or name in KEEP_SOURCE or mpy_cross is None:
+            shutil.copy(src, out_dir)
+            if name.endswith('.py'):
+                results.append((name, os.path.getsize(src), os.path.getsize(src), False))
+            continue
+        out = os.path.join(out_dir, name[:-3] + '.mpy')
+        # -s keeps the path short in tracebacks, the badge only has the file name
+        proc = subprocess.run(mpy_cross + ['-march=' + arch, '-s', name, '-o', out, src],
+                              stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+        if proc.returncode != 0:
+            print('%s: mpy-cross failed, uploading the source\n%s' % (src, proc.stdout.strip()))
+            shutil.copy(src, out_dir)
+            results.append((name, os.path.getsize(src), os.path.getsize(src), False))
+        else:
+            results.append((name, os.path.getsize(src), os.path.getsize(out), True))
+    return results
+
+
+def mpremote(port, *args):
+    return subprocess.run([sys.executable, '-m', 'mpremote', 'connect', 'port:' + port] + list(args),
+                          stdout=subprocess.PIPE, universal_newlines=True).stdout
+
+
+def measure_compile_ms(port, src_dir, names):
+    """Time compile() of each source on the badge, what every launch of a .py pays."""
+    timings = {}
+    for name in names:
+        mpremote(port, 'fs', 'cp', os.path.join(src_dir, name), ':' + MEASURE_FILE)
+        out = mpremote(port, 'exec', (
+            'import time, gc\n'
+            'src = open(%r).read()\n'
+            'gc.collect()\n'
+            't = time.ticks_ms()\n'
+            'compile(src, %r, "exec")\n'
+            'print("ms", time.ticks_diff(time.ticks_ms(), t))\n' % (MEASURE_FILE, name)))
+        for line in out.splitlines():
+            if line.startswith('ms '):
+                timings[name] = int(line.split()[1])
+    mpremote(port, 'fs', 'rm', ':' + MEASURE_FILE)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompile badge modules with mpy-cross")
+    parser.add_argument('dirs', nargs='+', help="directories to compile, like lib/badgelib or apps/kolab_game")
+    parser.add_argument('--arch', default=os.environ.get('MPY_ARCH', DEFAULT_ARCH))
+    parser.add_argument('--measure', metavar='PORT',
+                        help="time compiling each source on the badge at PORT")
+    args = parser.parse_args()
+
+    if os.environ.get('NO_MPY'):
+        mpy_cross = None
+        print('NO_MPY is set, uploading sources')
+    else:
+        mpy_cross = find_mpy_cross()
+        if mpy_cross is None:
+            print('mpy-cross not found (pip3 install mpy-cross), uploading sources')
+        else:
+            version = mpy_version(mpy_cross)
+            if version != MPY_VERSION:
+                print('%s emits mpy %s, the badge loads %s: pip3 install mpy-cross==1.23.0, '
+                      'or NO_MPY=1 to upload sources' % (' '.join(mpy_cross), version or 'of unknown version',
+                                                          MPY_VERSION))
+                sys.exit(1)
+    for src_dir in args.dirs:
+        src_dir = os.path.normpath(src_dir)
+        start = time.time()
+        results = compile_dir(src_dir, mpy_cross, args.arch)
+        py_total = sum(r[1] for r in results)
+        out_total = sum(r[2] for r in results)
+        compiled = [r[0] for r in results if r[3]]
+        line = '%s: %d of %d modules compiled, %d -> %d bytes (%d saved) in %.1f s' % (
+            src_dir, len(compiled), len(results), py_total, out_total, py_total - out_total, time.time() - start)
+        if args.measure and compiled:
+            timings = measure_compile_ms(args.measure, src_dir, compiled)
+            if timings:
+                line += ', %d ms compile skipped per launch (%s)' % (
+                    sum(timings.values()), ', '.join('%s %d ms' % t for t in sorted(timings.items())))
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,9 @@
 #!/bin/bash
 PORT=$1
+./upload-lib.sh $PORT || exit 1
 for dir in apps/*; do
   echo "doing upload.sh for dir [$dir] to port $PORT"
   dir=${dir//apps\//}
-  ./upload-one.sh $dir $PORT
+  SKIP_LIB=1 ./upload-one.sh $dir $PORT
 done
 ./connect.sh $PORT reset
@@ -0,0 +1,19 @@
+#!/bin/bash
+DEFAULT_PORT=/dev/cu.usbmodem313371
+PORT="${1:-$DEFAULT_PORT}"
+echo "uploading shared lib to $PORT"
+
+python3 -m mpremote connect port:$PORT fs mkdir :lib 1>/dev/null 2>/dev/null
+for dir in lib/*; do
+  # Compiled to build/$dir, sources where mpy-cross is missing or fails
+  python3 precompile.py ${MEASURE:+--measure $PORT} $dir || exit 1
+  python3 -m mpremote connect port:$PORT fs mkdir :$dir 1>/dev/null 2>/dev/null
+  for file in build/$dir/*; do
+    name=${file#build/}
+    # A .py left over from an earlier upload would be imported instead of the .mpy
+    if [[ $name == *.mpy ]]; then
+      python3 -m mpremote connect port:$PORT fs rm :${name%.mpy}.py 1>/dev/null 2>/dev/null
+    fi
+    python3 -m mpremote connect port:$PORT fs cp $file :$name || exit 1
+  done
+done
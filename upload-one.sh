@@ -8,10 +8,21 @@ APP_DIR="${1:-$DEFAULT_DIR}"
 PORT="${2:-$DEFAULT_PORT}"
 echo "uploading app [$APP_DIR] to $PORT"
 
+# Apps import the shared badgelib package, upload-all.sh sends it once up front
+if [ -z "$SKIP_LIB" ]; then
+  ./upload-lib.sh $PORT || exit 1
+fi
+
 python3 -m mpremote connect port:$PORT fs mkdir :apps 1>/dev/null 2>/dev/null
 python3 -m mpremote connect port:$PORT fs mkdir :apps/$APP_DIR 1>/dev/null 2>/dev/null
-for file in apps/$APP_DIR/*; do
-  python3 -m mpremote connect port:$PORT fs cp $file :$file || exit 1
+python3 precompile.py ${MEASURE:+--measure $PORT} apps/$APP_DIR || exit 1
+for file in build/apps/$APP_DIR/*; do
+  name=${file#build/}
+  # A .py left over from an earlier upload would be imported instead of the .mpy
+  if [[ $name == *.mpy ]]; then
+    python3 -m mpremote connect port:$PORT fs rm :${name%.mpy}.py 1>/dev/null 2>/dev/null
+  fi
+  python3 -m mpremote connect port:$PORT fs cp $file :$name || exit 1
 done
 
 python3 -m mpremote connect port:$PORT fs mkdir :None 1>/dev/null 2>/dev/null
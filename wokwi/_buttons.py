@@ -1,33 +1,83 @@
 # Generic GPIO input wrapper
 # Versions for other badges must expose the same API
+#
+# The pin interrupt only writes the raw edge into a preallocated ring, no
+# lookups, no allocation and no debouncing. The callbacks run afterwards from
+# micropython.schedule, outside of the interrupt, in the order of the edges.
+# Contact bounce is left to the callback, badgelib's EventQueue debounces.
+# When the ring overflows the callbacks get the level every pin is at once it
+# is empty, so the last level is never lost.
 
 import machine
+import micropython
+
+QUEUE = 16
 
 _gpios     = []
 _pins      = []
 _callbacks = []
 _states    = []
 
-def _cb(pin):
-	global _pins, _gpios, _callbacks, _states
-	position = _pins.index(pin)
-	gpio = _gpios[position]
-	callback = _callbacks[position]
-	prevState = _states[position]
-	if callable(callback) and (prevState != pin.value()):
-		_states[position] = pin.value()
-		callback(not pin.value())
-	
+# Ring of (position, pressed) written by the interrupts
+_queue_position = bytearray(QUEUE)
+_queue_pressed  = bytearray(QUEUE)
+_head      = 0
+_tail      = 0
+_scheduled = False
+_overflow  = False
+
+def _dispatch(_):
+	global _head, _scheduled, _overflow
+	_scheduled = False
+	while _head != _tail:
+		i = _head
+		callback = _callbacks[_queue_position[i]]
+		_head = (i + 1) % QUEUE
+		if callable(callback):
+			callback(_queue_pressed[i] == 1)
+	if _overflow:
+		_overflow = False
+		for position in range(len(_pins)):
+			state = _pins[position].value()
+			_states[position] = state
+			callback = _callbacks[position]
+			if callable(callback):
+				callback(state == 0)
+
+def _irq(position):
+	# One handler per pin, made at register time so the interrupt knows its position
+	def handler(pin):
+		global _tail, _scheduled, _overflow
+		state = pin.value()
+		if state == _states[position]:
+			return
+		following = (_tail + 1) % QUEUE
+		if following == _head:
+			_overflow = True
+		else:
+			_states[position] = state
+			_queue_position[_tail] = position
+			_queue_pressed[_tail] = 0 if state else 1
+			_tail = following
+		if not _scheduled:
+			try:
+				micropython.schedule(_dispatch, None)
+				_scheduled = True
+			except RuntimeError:
+				# Scheduler queue full, the next edge schedules again
+				pass
+	return handler
+
 def register(gpio, action=None):
 	global _pins, _gpios, _callbacks, _states
 	if gpio in _gpios:
 		return False
 	pin = machine.Pin(gpio, machine.Pin.IN)
-	pin.irq(handler=_cb, trigger=machine.Pin.IRQ_RISING|machine.Pin.IRQ_FALLING)
 	_gpios.append(gpio)
 	_pins.append(pin)
 	_callbacks.append(action)
 	_states.append(pin.value())
+	pin.irq(handler=_irq(len(_pins) - 1), trigger=machine.Pin.IRQ_RISING|machine.Pin.IRQ_FALLING)
 	return True
 
 def attach(gpio, action):
@@ -49,15 +99,15 @@ def pin(gpio):
 	return _pins[position]
 
 def value(gpio):
-	pin = pin(gpio)
-	if not pin:
+	p = pin(gpio)
+	if not p:
 		return None
-	return pin.value()
+	return p.value()
 
 def getCallback(gpio):
 	global _pins, _gpios, _callbacks
 	if not gpio in _gpios:
 		return None
-	position = _pins.index(pin)
+	position = _gpios.index(gpio)
 	callback = _callbacks[position]
 	return callback
@@ -23,40 +23,17 @@ __cb = []
 def __cbReboot(pressed):
 	raise NotImplementedError('reboot not implemented')
 
-# --- INTERNAL CALLBACK WRAPPERS ---
+# --- INTERNAL CALLBACK DISPATCH ---
 
-def __cb_btn_a(arg):
-	if __cb[-1][BTN_A]:
-		__cb[-1][BTN_A](arg)
-
-def __cb_btn_b(arg):
-	if __cb[-1][BTN_B]:
-		__cb[-1][BTN_B](arg)
-
-def __cb_btn_up(arg):
-	if __cb[-1][BTN_UP]:
-		__cb[-1][BTN_UP](arg)
-
-def __cb_btn_down(arg):
-	if __cb[-1][BTN_DOWN]:
-		__cb[-1][BTN_DOWN](arg)
-
-def __cb_btn_left(arg):
-	if __cb[-1][BTN_LEFT]:
-		__cb[-1][BTN_LEFT](arg)
-
-def __cb_btn_right(arg):
-	if __cb[-1][BTN_RIGHT]:
-		__cb[-1][BTN_RIGHT](arg)
+def __dispatch(button, arg):
+	# Mappings are flat lists indexed by button
+	callback = __cb[-1][button]
+	if callback:
+		callback(arg)
 
 def __init():
-	global mappings
-	_buttons.register( _gpioMap[BTN_A],     __cb_btn_a     )
-	_buttons.register( _gpioMap[BTN_B],     __cb_btn_b     )
-	_buttons.register( _gpioMap[BTN_UP],    __cb_btn_up    )
-	_buttons.register( _gpioMap[BTN_DOWN],  __cb_btn_down  )
-	_buttons.register( _gpioMap[BTN_LEFT],  __cb_btn_left  )
-	_buttons.register( _gpioMap[BTN_RIGHT], __cb_btn_right )
+	for button in range(__num):
+		_buttons.register(_gpioMap[button], lambda arg, button=button: __dispatch(button, arg))
 	pushMapping() #Add the initial / default mapping
 	
 # --- PUBLIC API ---
@@ -93,7 +70,7 @@ def pushMapping(newMapping=None):
 	global __cb
 	if newMapping == None:
 		newMapping = { BTN_UP: None, BTN_DOWN: None, BTN_LEFT: None, BTN_RIGHT: None, BTN_A: None, BTN_B: __cbReboot }
-	__cb.append(newMapping)
+	__cb.append([newMapping.get(button) for button in range(__num)])
 
 def popMapping():
 	global __cb
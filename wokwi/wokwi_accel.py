@@ -7,13 +7,14 @@ class Accel:
     print("Setting up I2C and Accelerometer")
     self.i2c = I2C(0, sda=Pin(18), scl=Pin(19))  # Use I2C0 with GPIO 8 (SDA) and GPIO 9 (SCL)
     try:
-        self.mpu = mpu6050.MPU6050(self.i2c)
+        self.mpu = wokwi_mpu6050.MPU6050(self.i2c)
         print("MPU6050 initialized successfully")
     except Exception as e:
         print(f"Error initializing MPU6050: {e}")
         self.mpu = None
   def get_xyz(self):
-    return self.mpu.acceleration()
+    # Raw counts like the badge firmware's accel.get_xyz(), the apps compare them to ints
+    return self.mpu.read_raw()
 
 _accel = None
 
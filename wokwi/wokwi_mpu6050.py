@@ -7,29 +7,35 @@ class MPU6050:
     MPU6050_ADDR = 0x68
     PWR_MGMT_1 = 0x6B
     ACCEL_XOUT_H = 0x3B
+    # Raw counts per g, assumes the accelerometer is set to +/- 2g
+    ACCEL_SCALE = 16384.0
 
     def __init__(self, i2c):
         self.i2c = i2c
         self.address = self.MPU6050_ADDR
+        # X, Y and Z as big endian int16, filled by one burst read
+        self._buf = bytearray(6)
+        # First 2 bytes for single register reads, made once so reads don't allocate
+        self._word = memoryview(self._buf)[:2]
         time.sleep(1)  # Add delay after initializing I2C
         self.i2c.writeto_mem(self.address, self.PWR_MGMT_1, b'\x00')  # Wake up MPU6050
 
     def read_raw_data(self, register):
         # Read 2 bytes of data from the given register
-        high = self.i2c.readfrom_mem(self.address, register, 1)
-        low = self.i2c.readfrom_mem(self.address, register + 1, 1)
-        value = ustruct.unpack('>h', high + low)[0]
-        return value
+        self.i2c.readfrom_mem_into(self.address, register, self._word)
+        return ustruct.unpack_from('>h', self._buf)[0]
 
-    def acceleration(self):
-        ax = self.read_raw_data(self.ACCEL_XOUT_H)
-        ay = self.read_raw_data(self.ACCEL_XOUT_H + 2)
-        az = self.read_raw_data(self.ACCEL_XOUT_H + 4)
+    def read_raw(self):
+        """(x, y, z) in raw counts, the 6 registers in one I2C transaction."""
+        self.i2c.readfrom_mem_into(self.address, self.ACCEL_XOUT_H, self._buf)
+        return ustruct.unpack_from('>hhh', self._buf)
 
-        # Convert to 'g' units (1g = 9.81m/s^2)
-        accel_scale_modifier = 16384.0  # Assumes the accelerometer is set to +/- 2g
-        ax = ax / accel_scale_modifier
-        ay = ay / accel_scale_modifier
-        az = az / accel_scale_modifier
+    def acceleration(self, raw=False):
+        """(x, y, z) in g, or in raw counts (+/- 16384 per g) without float math."""
+        ax, ay, az = self.read_raw()
+        if raw:
+            return (ax, ay, az)
 
-        return (ax, ay, az)
\ No newline at end of file
+        # Convert to 'g' units (1g = 9.81m/s^2)
+        scale = self.ACCEL_SCALE
+        return (ax / scale, ay / scale, az / scale)